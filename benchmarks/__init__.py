@@ -0,0 +1,46 @@
+"""Benchmarks of the render pipeline and client API.
+
+Run with `python -m benchmarks`, see `--help`
+"""
+
+from __future__ import annotations
+
+__all__ = ["Result", "measure"]
+
+import statistics
+import time
+import typing as t
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True, slots=True)
+class Result:
+    """Benchmark result
+
+    `higher_is_better` tells how to compare it with other runs
+    """
+
+    value: float
+    unit: str
+    higher_is_better: bool = True
+
+
+def measure(func: t.Callable[[], t.Any], min_time: float) -> Result:
+    """Call func repeatedly for at least `min_time` seconds
+
+    Returns median calls per second of 5 rounds
+    """
+    rates: list[float] = []
+
+    for _ in range(5):
+        calls = 0
+        started = time.perf_counter()
+        deadline = started + min_time / 5
+
+        while (now := time.perf_counter()) < deadline or calls == 0:
+            func()
+            calls += 1
+
+        rates.append(calls / (now - started))
+
+    return Result(statistics.median(rates), "ops/s")
@@ -0,0 +1,125 @@
+"""Run benchmarks, save and compare results.
+
+python -m benchmarks [--quick] [--only render,plugins,api,stream]
+    [--save [LABEL]] [--compare FILE]
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import json
+import logging
+import pathlib
+import subprocess
+import tomllib
+
+from . import Result, bench_api, bench_plugins, bench_render, bench_stream
+
+SUITES = {
+    "render": bench_render.run,
+    "plugins": bench_plugins.run,
+    "api": bench_api.run,
+    "stream": bench_stream.run,
+}
+
+ROOT = pathlib.Path(__file__).parent
+RESULTS_DIR = ROOT / "results"
+
+
+def _version() -> str:
+    with (ROOT.parent / "pyproject.toml").open("rb") as f:
+        return tomllib.load(f)["tool"]["poetry"]["version"]
+
+
+def _revision() -> str:
+    """Git revision of the tree, `-dirty` if it has uncommitted changes"""
+    try:
+        return subprocess.run(
+            ["git", "describe", "--always", "--dirty"],  # noqa: S607
+            cwd=ROOT.parent,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _compare(results: dict[str, Result], path: pathlib.Path) -> None:
+    with path.open() as f:
+        previous = json.load(f)["results"]
+
+    print(f"\nCompared with {path.name}:")  # noqa: T201
+
+    for name, result in results.items():
+        if name not in previous or not previous[name]["value"]:
+            continue
+
+        ratio = result.value / previous[name]["value"]
+        if not result.higher_is_better:
+            ratio = 1 / ratio
+
+        mark = "  REGRESSION" if ratio < 0.9 else ""
+        print(f"{name:<56} {ratio:6.2f}x{mark}")  # noqa: T201
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    parser.add_argument("--quick", action="store_true", help="shorter rounds")
+    parser.add_argument("--only", help="comma-separated suites: " + ",".join(SUITES))
+    parser.add_argument(
+        "--save",
+        nargs="?",
+        const="",
+        metavar="LABEL",
+        help=f"save results to {RESULTS_DIR.name}/<LABEL>.json, "
+        "<time>-<git revision>.json by default",
+    )
+    parser.add_argument("--compare", type=pathlib.Path, help="previous results file")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+
+    min_time = 0.5 if args.quick else 2.0
+    suites = args.only.split(",") if args.only else list(SUITES)
+    results: dict[str, Result] = {}
+
+    for suite in suites:
+        for name, result in SUITES[suite](min_time).items():
+            print(f"{name:<56} {result.value:14.2f} {result.unit}")  # noqa: T201
+            results[name] = result
+
+    if args.compare:
+        _compare(results, args.compare)
+
+    if args.save is not None:
+        now = dt.datetime.now(dt.UTC)
+        revision = _revision()
+        label = args.save or f"{now:%Y%m%d-%H%M%S}-{revision}"
+
+        RESULTS_DIR.mkdir(exist_ok=True)
+        path = RESULTS_DIR / f"{label}.json"
+        with path.open("w") as f:
+            json.dump(
+                {
+                    "version": _version(),
+                    "revision": revision,
+                    "time": now.isoformat(timespec="seconds"),
+                    "results": {
+                        name: {
+                            "value": result.value,
+                            "unit": result.unit,
+                            "higher_is_better": result.higher_is_better,
+                        }
+                        for name, result in results.items()
+                    },
+                },
+                f,
+                indent=2,
+            )
+        print(f"\nSaved to {path}")  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""End-to-end client API throughput and latency"""
+
+from __future__ import annotations
+
+import http.client
+import json
+import socket
+import statistics
+import threading
+import time
+
+from . import Result
+from .common import make_deck
+
+CLIENT_COUNTS = [1, 8, 32]
+ROWS, COLS = 10, 10
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_for_server(port: int, timeout: float = 10) -> None:
+    deadline = time.monotonic() + timeout
+
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.1):
+                return
+        except OSError:
+            time.sleep(0.05)
+
+    msg = "Deck web interface didn't start"
+    raise TimeoutError(msg)
+
+
+def _client(
+    port: int,
+    request: tuple[str, str, bytes | None],
+    duration: float,
+    latencies: list[float],
+) -> None:
+    """Send requests one after another over a keep-alive connection"""
+    method, path, body = request
+    headers = {"Content-Type": "application/json"} if body else {}
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    deadline = time.perf_counter() + duration
+
+    while (started := time.perf_counter()) < deadline:
+        connection.request(method, path, body, headers)
+        connection.getresponse().read()
+        latencies.append(time.perf_counter() - started)
+
+    connection.close()
+
+
+def _load(
+    port: int,
+    request: tuple[str, str, bytes | None],
+    clients: int,
+    duration: float,
+) -> list[float]:
+    latencies: list[float] = []
+    threads = [
+        threading.Thread(target=_client, args=(port, request, duration, latencies))
+        for _ in range(clients)
+    ]
+
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return latencies
+
+
+def run(min_time: float) -> dict[str, Result]:
+    results: dict[str, Result] = {}
+
+    port = _free_port()
+    deck, manager = make_deck(ROWS, COLS, port=port)
+    deck.start()
+    _wait_for_server(port)
+
+    connection = http.client.HTTPConnection("127.0.0.1", port)
+    connection.request("GET", "/api/buttons")
+    version = connection.getresponse().getheader("X-Deck-Version")
+    connection.close()
+
+    requests: dict[str, tuple[str, str, bytes | None]] = {
+        "GET /api/buttons": ("GET", "/api/buttons", None),
+        "GET /api/buttons?since": ("GET", f"/api/buttons?since={version}", None),
+        "POST /api/event": (
+            "POST",
+            "/api/event",
+            json.dumps({"type": "click", "data": {"button_id": "0:0"}}).encode(),
+        ),
+    }
+
+    # Keep one button changing, like a clock would
+    ticker_running = True
+
+    def ticker() -> None:
+        while ticker_running:
+            manager.refresh("stub0")
+            time.sleep(0.1)
+
+    threading.Thread(target=ticker, daemon=True).start()
+
+    for name, request in requests.items():
+        for clients in CLIENT_COUNTS:
+            latencies = _load(port, request, clients, min_time)
+            key = f"{name}[{clients} clients]"
+
+            results[f"{key} throughput"] = Result(len(latencies) / min_time, "req/s")
+            results[f"{key} p50"] = Result(
+                statistics.median(latencies) * 1000,
+                "ms",
+                higher_is_better=False,
+            )
+            results[f"{key} p99"] = Result(
+                statistics.quantiles(latencies, n=100)[98] * 1000,
+                "ms",
+                higher_is_better=False,
+            )
+
+    ticker_running = False
+    deck.stop()
+
+    return results
@@ -0,0 +1,28 @@
+"""PluginManager variables and actions merge"""
+
+from __future__ import annotations
+
+from . import Result, measure
+from .common import make_plugin_manager
+
+PLUGIN_COUNTS = [1, 10, 100]
+
+
+def run(min_time: float) -> dict[str, Result]:
+    results: dict[str, Result] = {}
+
+    for count in PLUGIN_COUNTS:
+        manager = make_plugin_manager(count)
+
+        results[f"PluginManager.variables[{count}]"] = measure(
+            lambda manager=manager: manager.variables,
+            min_time,
+        )
+        results[f"PluginManager.actions[{count}]"] = measure(
+            lambda manager=manager: manager.actions,
+            min_time,
+        )
+
+        manager.stop()
+
+    return results
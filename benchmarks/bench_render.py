@@ -0,0 +1,53 @@
+"""Deck.update and button serialization"""
+
+from __future__ import annotations
+
+import tracemalloc
+import typing as t
+
+from pydeck.pydeck import buttons_as_list
+
+from . import Result, measure
+from .common import GRID_SIZES, make_buttons, make_deck
+
+
+def run(min_time: float) -> dict[str, Result]:
+    results: dict[str, Result] = {}
+
+    for rows, cols in GRID_SIZES:
+        size = f"{rows}x{cols}"
+
+        for scenario, changing in (("idle", 0), ("one", 1), ("all", rows * cols)):
+            deck, manager = make_deck(rows, cols, changing=changing)
+
+            def update(deck: t.Any = deck, manager: t.Any = manager) -> None:  # noqa: ANN401
+                manager.refresh("stub0")
+                deck.update()
+
+            results[f"deck.update[{size},{scenario}]"] = measure(update, min_time)
+            deck.stop()
+
+        buttons = make_buttons(rows, cols, changing=0)
+        button = next(iter(buttons.values()))
+
+        results[f"buttons_as_list[{size}]"] = measure(
+            lambda buttons=buttons: buttons_as_list(buttons),
+            min_time,
+        )
+
+    results["Button.as_dict"] = measure(button.as_dict, min_time)  # type: ignore[reportPossiblyUnbound]
+    results["Button memory"] = _button_memory()
+
+    return results
+
+
+def _button_memory() -> Result:
+    """Memory held by one button of the largest grid"""
+    rows, cols = GRID_SIZES[-1]
+
+    tracemalloc.start()
+    buttons = make_buttons(rows, cols, changing=0)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return Result(size / len(buttons), "B", higher_is_better=False)
@@ -0,0 +1,100 @@
+"""Stream fan-out: cost of a frame and of its delivery as clients are added
+
+Frames are encoded once, whatever the number of clients: `encode per
+frame` stays constant. Delivery is per client (a queue put and a socket
+write each), so deck CPU grows with clients while `deck CPU per message`
+(above the idle deck's) and `fan-out per client` stay flat.
+"""
+
+from __future__ import annotations
+
+import itertools
+import time
+
+from pydeck.button import Button
+from pydeck.snapshot import SnapshotLog
+from pydeck.stream import Broadcaster, sse_message
+
+from . import Result, measure
+from .loadgen import DeckProcess, StreamClients
+
+CLIENT_COUNTS = [1, 100, 300]
+ROWS, COLS = 10, 10
+
+
+def run(min_time: float) -> dict[str, Result]:
+    results: dict[str, Result] = {}
+    duration = max(min_time * 2, 1)
+
+    for count in CLIENT_COUNTS:
+        results.update(_frame_costs(count, min_time))
+
+    with DeckProcess(ROWS, COLS) as deck:
+        cpu, started = deck.cpu_time(), time.monotonic()
+        time.sleep(duration)
+        idle = (deck.cpu_time() - cpu) / (time.monotonic() - started)
+
+        for count in CLIENT_COUNTS:
+            with StreamClients("127.0.0.1", deck.port, count) as clients:
+                clients.run(1)  # Connect and receive the full state
+                frames, started = clients.frames, time.monotonic()
+                cpu = deck.cpu_time()
+
+                clients.run(duration)
+
+                elapsed = time.monotonic() - started
+                cpu = deck.cpu_time() - cpu
+                messages = clients.frames - frames
+                key = f"Stream[{count} clients]"
+                results[f"{key} deck CPU"] = Result(
+                    cpu / elapsed * 100,
+                    "%",
+                    higher_is_better=False,
+                )
+                results[f"{key} deck CPU per message"] = Result(
+                    max(cpu - idle * elapsed, 0) / max(messages, 1) * 1e6,
+                    "us",
+                    higher_is_better=False,
+                )
+                results[f"{key} messages"] = Result(messages / elapsed, "msg/s")
+
+    return results
+
+
+def _frame_costs(count: int, min_time: float) -> dict[str, Result]:
+    """In-process encode and fan-out of a one-button change"""
+    snapshots = SnapshotLog(0, 64)
+    snapshots.publish(
+        {
+            (row, col): Button(f"{row}:{col}")
+            for row in range(ROWS)
+            for col in range(COLS)
+        }
+    )
+    broadcaster = Broadcaster()
+    # Never read: queues overflow, which costs the same as a put
+    subscriptions = [broadcaster.subscribe() for _ in range(count)]
+    tick = itertools.count()
+
+    def encode() -> tuple[int, bytes]:
+        snapshot = snapshots.publish({(0, 0): Button(str(next(tick)))})
+        return snapshot.version, sse_message(snapshots.delta(snapshot.version - 1))
+
+    encoded = measure(encode, min_time)
+    frame = encode()
+    fanout = measure(lambda: broadcaster.publish(frame), min_time)
+    del subscriptions
+
+    key = f"Stream[{count} clients]"
+    return {
+        f"{key} encode per frame": Result(
+            1e6 / encoded.value,
+            "us",
+            higher_is_better=False,
+        ),
+        f"{key} fan-out per client": Result(
+            1e6 / fanout.value / count,
+            "us",
+            higher_is_better=False,
+        ),
+    }
@@ -0,0 +1,73 @@
+"""Deck set up for benchmarks"""
+
+from __future__ import annotations
+
+import copy
+import math
+import tempfile
+import typing as t
+
+from pydeck.button import Button
+from pydeck.config import config
+from pydeck.page import DEFAULT_PAGE
+from pydeck.pluginmanager import PluginManager
+from pydeck.pydeck import Deck
+
+from .stubs import StubPlugin
+
+if t.TYPE_CHECKING:
+    from pydeck.pydeck import ButtonMatrix
+
+GRID_SIZES = [(3, 5), (10, 10), (32, 32), (50, 80)]
+
+_plugin_dir = tempfile.mkdtemp(prefix="pydeck-bench-")
+
+
+def make_plugin_manager(plugins: int = 1) -> PluginManager:
+    """Plugin manager with stub plugins `stub0`...`stubN`"""
+    manager = PluginManager(_plugin_dir)
+
+    for i in range(plugins):
+        manager.add(f"stub{i}", StubPlugin())  # type: ignore[reportArgumentType]
+
+    return manager
+
+
+def make_buttons(rows: int, cols: int, *, changing: int) -> ButtonMatrix:
+    """Button on every cell
+
+    First `changing` buttons use the variable changed by `StubPlugin.update`
+    """
+    buttons: ButtonMatrix = {}
+
+    for i in range(rows * cols):
+        variable = "var0" if i < changing else f"var{1 + i % 9}"
+        buttons[(i // cols, i % cols)] = Button(
+            f"{{stub0__{variable}}}<br>{i}",
+            action="stub0__noop",
+        )
+
+    return buttons
+
+
+def make_deck(
+    rows: int,
+    cols: int,
+    *,
+    changing: int = 1,
+    port: int = 0,
+) -> tuple[Deck, PluginManager]:
+    """Deck with buttons on every cell and one stub plugin"""
+    deck_config = copy.deepcopy(config)
+    deck_config["deck"]["rows"] = rows
+    deck_config["deck"]["cols"] = cols
+    deck_config["server"]["port"] = port
+
+    manager = make_plugin_manager()
+    deck = Deck(deck_config, manager)
+    deck.set_buttons(make_buttons(rows, cols, changing=changing))
+    # Render as if a client was always looking
+    deck.pages[DEFAULT_PAGE].view(math.inf)
+    deck.update()
+
+    return deck, manager
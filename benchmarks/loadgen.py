@@ -0,0 +1,237 @@
+"""Load generator: many stream clients against one deck
+
+python -m benchmarks.loadgen [--clients N] [--slow N] [--duration S] [--port P]
+
+Without `--port`, starts a local deck in a subprocess (one button changing
+10 times a second) and reports its CPU usage. All clients are served by
+a single thread with non-blocking sockets, so hundreds of them are cheap.
+"""
+
+from __future__ import annotations
+
+__all__ = ["DeckProcess", "StreamClients"]
+
+import argparse
+import logging
+import selectors
+import socket
+import subprocess
+import sys
+import threading
+import time
+import typing as t
+
+from .bench_api import _free_port, _wait_for_server
+from .common import make_deck
+
+if t.TYPE_CHECKING:
+    from types import TracebackType
+
+TICK_INTERVAL = 0.1
+
+
+class StreamClients:
+    """Connections to `/api/stream` which count received messages
+
+    Slow clients connect but never read, so the server has to cope with
+    their full socket buffers.
+    """
+
+    frames: int
+    received: int
+    _selector: selectors.DefaultSelector
+    _sockets: list[socket.socket]
+    _tails: dict[socket.socket, bytes]
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        clients: int,
+        *,
+        slow: int = 0,
+        page: str = "main",
+    ) -> None:
+        self.frames = 0
+        self.received = 0
+        self._selector = selectors.DefaultSelector()
+        self._sockets = []
+        self._tails = {}
+
+        request = (
+            f"GET /api/stream?page={page} HTTP/1.1\r\nHost: {host}\r\n\r\n".encode()
+        )
+
+        for i in range(clients + slow):
+            sock = socket.create_connection((host, port), timeout=10)
+            # Slow clients barely buffer anything
+            if i >= clients:
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+            sock.sendall(request)
+            sock.setblocking(False)  # noqa: FBT003
+            self._sockets.append(sock)
+
+            if i < clients:
+                self._tails[sock] = b""
+                self._selector.register(sock, selectors.EVENT_READ)
+
+    def run(self, duration: float) -> None:
+        """Read from every client for `duration` seconds"""
+        deadline = time.monotonic() + duration
+
+        while (remaining := deadline - time.monotonic()) > 0:
+            for key, _ in self._selector.select(remaining):
+                sock = t.cast("socket.socket", key.fileobj)
+                try:
+                    chunk = sock.recv(65536)
+                except BlockingIOError:
+                    continue
+                if not chunk:
+                    self._selector.unregister(sock)
+                    continue
+
+                self.received += len(chunk)
+                # Messages end with a blank line, which may span two chunks
+                data = self._tails[sock] + chunk
+                self.frames += data.count(b"\n\n")
+                self._tails[sock] = data[-1:]
+
+    def close(self) -> None:
+        self._selector.close()
+        for sock in self._sockets:
+            sock.close()
+
+    def __enter__(self) -> t.Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+
+class DeckProcess:
+    """Benchmark deck running in a subprocess, to measure its CPU time"""
+
+    port: int
+    _process: subprocess.Popen[str]
+
+    def __init__(self, rows: int, cols: int) -> None:
+        self._process = subprocess.Popen(  # noqa: S603
+            [
+                sys.executable,
+                "-m",
+                "benchmarks.loadgen",
+                "--serve",
+                f"--grid={rows}x{cols}",
+            ],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+        )
+        self.port = int(self._readline())
+
+    def cpu_time(self) -> float:
+        """CPU seconds used by the deck so far"""
+        t.cast("t.IO[str]", self._process.stdin).write("\n")
+        t.cast("t.IO[str]", self._process.stdin).flush()
+        return float(self._readline())
+
+    def stop(self) -> None:
+        t.cast("t.IO[str]", self._process.stdin).close()
+        self._process.wait(10)
+
+    def _readline(self) -> str:
+        line = t.cast("t.IO[str]", self._process.stdout).readline()
+        if not line:
+            msg = "Deck process exited"
+            raise RuntimeError(msg)
+        return line
+
+    def __enter__(self) -> t.Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.stop()
+
+
+def serve(rows: int, cols: int) -> None:
+    """Run benchmark deck, print its port, then CPU time per stdin line"""
+    logging.disable(logging.WARNING)
+
+    port = _free_port()
+    deck, manager = make_deck(rows, cols, port=port)
+    deck.start()
+    _wait_for_server(port)
+
+    def ticker() -> None:
+        while True:
+            manager.refresh("stub0")
+            time.sleep(TICK_INTERVAL)
+
+    threading.Thread(target=ticker, daemon=True).start()
+
+    print(port, flush=True)  # noqa: T201
+    for _ in sys.stdin:
+        print(time.process_time(), flush=True)  # noqa: T201
+
+    deck.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.loadgen")
+    parser.add_argument("--clients", type=int, default=200, help="reading clients")
+    parser.add_argument("--slow", type=int, default=0, help="clients never reading")
+    parser.add_argument("--duration", type=float, default=10, help="seconds")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, help="running deck, local one if unset")
+    parser.add_argument("--page", default="main")
+    parser.add_argument("--grid", default="10x10", help="local deck size")
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    rows, cols = map(int, args.grid.split("x"))
+
+    if args.serve:
+        serve(rows, cols)
+        return
+
+    deck = DeckProcess(rows, cols) if args.port is None else None
+    port = deck.port if deck else args.port
+
+    try:
+        with StreamClients(
+            args.host,
+            port,
+            args.clients,
+            slow=args.slow,
+            page=args.page,
+        ) as clients:
+            clients.run(1)  # Let every client connect and get the full state
+            frames, started = clients.frames, time.monotonic()
+            cpu = deck.cpu_time() if deck else 0
+
+            clients.run(args.duration)
+
+            elapsed = time.monotonic() - started
+            print(f"clients: {args.clients} reading, {args.slow} slow")  # noqa: T201
+            print(f"messages: {(clients.frames - frames) / elapsed:.0f}/s")  # noqa: T201
+            print(f"received: {clients.received / 1024:.0f} KiB")  # noqa: T201
+            if deck:
+                usage = (deck.cpu_time() - cpu) / elapsed * 100
+                print(f"deck CPU: {usage:.1f}%")  # noqa: T201
+    finally:
+        if deck:
+            deck.stop()
+
+
+if __name__ == "__main__":
+    main()
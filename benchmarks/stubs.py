@@ -0,0 +1,37 @@
+"""Offline stand-ins for plugins"""
+
+from __future__ import annotations
+
+import typing as t
+
+
+class StubPlugin:
+    """Plugin with `size` variables and a no-op action
+
+    `update` changes only `var0`
+    """
+
+    name = "Stub"
+    description = "Benchmark plugin"
+    author = "pydeck"
+
+    # Updated manually by benchmarks, not by the scheduler
+    update_interval = 1e9
+
+    config: dict[str, t.Any]
+    variables: dict[str, t.Any]
+    actions: dict[str, t.Any]
+
+    def __init__(self, size: int = 10) -> None:
+        self.config = {}
+        self.variables = {f"var{i}": "" for i in range(size)}
+        self.actions = {"noop": self._noop}
+        self._ticks = 0
+
+    def load(self) -> None: ...
+
+    def update(self) -> None:
+        self._ticks += 1
+        self.variables = self.variables | {"var0": str(self._ticks)}
+
+    def _noop(self) -> None: ...
@@ -1,4 +1,9 @@
+// Replaced with one generated from server config when served by pydeck
 const config = {
   address: "127.0.0.1",
   port: 8192,
-}
\ No newline at end of file
+  // "stream" (server push) or "poll"
+  mode: "stream",
+  // "json" or "msgpack" (compact binary buttons)
+  format: "json",
+};
\ No newline at end of file
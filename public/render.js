@@ -4,6 +4,10 @@
 const clientConfig = config;
 
 const HOST = `http://${clientConfig.address}:${clientConfig.port}`;
+// Deck page (profile) to show, `?page=<name>`
+const PAGE = encodeURIComponent(
+  new URLSearchParams(location.search).get("page") || "main",
+);
 const nav = `
   <div class="nav-fixed">
     <button onclick="changePage('deck')">Deck</button>
@@ -31,7 +35,20 @@ const nav = `
  *   text_align: string;
  *   font_family: string;
  *   font_size: string;
+ *   icon?: string;
  * }} JSONButton
+ * @typedef {{
+ *   version: number;
+ *   full: boolean;
+ *   buttons: Array<JSONButton>;
+ *   removed?: Array<[number, number]>;
+ * }} JSONDelta
+ * @typedef {{
+ *   version: number;
+ *   full: boolean;
+ *   buttons: Array<Button>;
+ *   removed?: Array<[number, number]>;
+ * }} Delta
  */
 
 /**
@@ -78,14 +95,18 @@ class Button {
   id_str;
   /** @type {string} */
   text;
+  /** @type {string | undefined} */
+  icon;
   /**
    * @param {[number, number]} id_arr
    * @param {string} text
+   * @param {string} [icon] content-hash URL, without size
    */
-  constructor(id_arr, text) {
+  constructor(id_arr, text, icon) {
     [this.row, this.col] = id_arr;
     this.id_str = `${this.row}:${this.col}`;
     this.text = text;
+    this.icon = icon;
   }
   /**
    * @returns {HTMLDivElement}
@@ -96,6 +117,14 @@ class Button {
     divElement.style.gridColumn = `${this.col + 1}`;
     divElement.style.gridRow = `${this.row + 1}`;
     divElement.innerHTML = this.text;
+    if (this.icon) {
+      let img = document.createElement("img");
+      img.classList.add("deck-icon");
+      img.src = `${HOST}/${this.icon}/${iconSize()}`;
+      img.alt = "";
+      img.decoding = "async";
+      divElement.prepend(img);
+    }
     divElement.onclick = () => {
       deck_click(this.id_str);
     };
@@ -103,6 +132,20 @@ class Button {
   }
 }
 
+/**
+ * Icon size (device pixels) fitting a grid cell, so the server resizes
+ * icons once for this screen
+ * @returns {number}
+ */
+function iconSize() {
+  let cell = Math.min(
+    window.innerWidth / deckConfig.deck.cols,
+    window.innerHeight / deckConfig.deck.rows,
+  );
+  // Server rounds up to its next size, round to 16 to share cache entries
+  return Math.ceil((cell * window.devicePixelRatio) / 16) * 16;
+}
+
 /**
  * @param {number} rows
  * @param {number} cols
@@ -174,6 +217,15 @@ class PageDeck {
    * @type {DeckConfig}
    */
   prev_config;
+  /**
+   * @type {EventSource | undefined}
+   */
+  source;
+  /**
+   * Last received render version
+   * @type {number}
+   */
+  version = -1;
 
   constructor() {
     this.rootEl = document.createElement("div");
@@ -193,13 +245,16 @@ class PageDeck {
    * @returns {Promise<void>}
    */
   async init() {
-    this.buttons = createBlankButtons(clientConfig.rows, clientConfig.cols);
+    // Server sends only configured buttons, the rest of the grid is blank
+    this.buttons = createBlankButtons(deckConfig.deck.rows, deckConfig.deck.cols);
     this.button_hashes = {};
     this.rendered = {};
     for (let id in this.buttons) {
       this.button_hashes[id] = JSON.stringify(this.buttons[id]);
     }
-    let buttons = await JSONToButtons(await fetchButtonsJSON());
+    let delta = await fetchButtonsDelta(-1);
+    this.version = delta.version;
+    let buttons = delta.buttons;
     buttons.forEach((button) => {
       this.button_hashes[button.id_str] = JSON.stringify(button);
       this.buttons[button.id_str] = button;
@@ -213,21 +268,64 @@ class PageDeck {
     this.container.replaceChildren(...to_append);
     this.pending_render = true;
     this.update_size();
+    if (clientConfig.mode === "stream") {
+      this.subscribe();
+    }
   }
   /**
-   * @returns {Promise<void>}
+   * Receive changed buttons from the server as soon as they are rendered
+   * @returns {void}
    */
-  async update() {
-    if (deckConfig != this.prev_config) {
-      this.prev_config = deckConfig;
-      this.update_size();
-      await this.init();
-      return;
+  subscribe() {
+    if (this.source) {
+      this.source.close();
     }
-    let new_buttons = await JSONToButtons(await fetchButtonsJSON());
+    this.source = new EventSource(`${HOST}/api/stream?page=${PAGE}`);
+    this.source.onmessage = (event) => {
+      this.applyDelta(JSONToDelta(JSON.parse(event.data)));
+      if (this.pending_render && pages[currentPage] === this) {
+        this.pending_render = false;
+        render();
+      }
+    };
+    // Page was removed from config
+    this.source.addEventListener("gone", (event) => {
+      this.source?.close();
+      showPage(JSON.parse(event.data).page);
+    });
+  }
+  /**
+   * @param {Delta} delta
+   * @returns {void}
+   */
+  applyDelta(delta) {
+    this.version = delta.version;
+    if (delta.full) {
+      // Buttons missing from the full list are blank
+      let present = new Set(delta.buttons.map((b) => `${b.id[0]}:${b.id[1]}`));
+      this.applyButtons(
+        Object.values(this.buttons)
+          .filter((button) => !present.has(button.id_str))
+          .map((button) => new Button([button.row, button.col], "&nbsp;")),
+      );
+    }
+    this.applyButtons(delta.buttons);
+    if (delta.removed) {
+      this.applyButtons(delta.removed.map((id) => new Button(id, "&nbsp;")));
+    }
+  }
+  /**
+   * @param {Array<Button>} new_buttons
+   * @returns {void}
+   */
+  applyButtons(new_buttons) {
     new_buttons.forEach((button) => {
       let id_str = button.id_str;
       let hash = JSON.stringify(button);
+      if (!this.rendered[id_str]) {
+        // Outside of the grid
+        return;
+      }
       if (this.button_hashes[id_str] !== hash) {
         this.button_hashes[id_str] = hash;
         this.buttons[id_str] = button;
@@ -236,6 +334,22 @@ class PageDeck {
       }
     });
   }
+  /**
+   * @returns {Promise<void>}
+   */
+  async update() {
+    if (deckConfig != this.prev_config) {
+      this.prev_config = deckConfig;
+      this.update_size();
+      await this.init();
+      return;
+    }
+    if (this.source) {
+      // Changes are pushed by the server
+      return;
+    }
+    this.applyDelta(await fetchButtonsDelta(this.version));
+  }
   /**
    * @returns {HTMLElement}
    */
@@ -322,38 +436,93 @@ var pages = {
 
 var currentPage = "loading";
 
+/** @type {Object[]} Events waiting for the request in flight */
+var pendingEvents = [];
+var eventsInFlight = false;
+
 /**
  * @param {string} button_id
  * @returns {void}
  */
 function deck_click(button_id) {
-  fetch(`${HOST}/api/event`, {
-    method: "POST",
-    headers: {
-      Accept: "*",
-      "Access-Control-Allow-Origin": "*",
-      "Content-Type": "application/json",
+  pendingEvents.push({
+    type: "click",
+    time: Date.now(),
+    data: {
+      button_id,
+      page: decodeURIComponent(PAGE),
     },
-    body: JSON.stringify({
-      type: "click",
-      data: {
-        button_id,
-      },
-    }),
   });
+  sendEvents();
 }
 
 /**
- * @returns {Promise<Array<JSONButton>>}
+ * Send queued events, taps made while a request is in flight go in one batch
+ * @returns {Promise<void>}
+ */
+async function sendEvents() {
+  if (eventsInFlight || pendingEvents.length === 0) {
+    return;
+  }
+  // Server accepts up to 64 events per request
+  let events = pendingEvents.splice(0, 64);
+  eventsInFlight = true;
+  try {
+    await fetch(`${HOST}/api/event`, {
+      method: "POST",
+      headers: {
+        Accept: "*",
+        "Access-Control-Allow-Origin": "*",
+        "Content-Type": "application/json",
+      },
+      body: JSON.stringify({ events }),
+    });
+  } catch (error) {
+    console.error(error);
+  } finally {
+    eventsInFlight = false;
+  }
+  sendEvents();
+}
+
+/**
+ * Reload the client with another deck page
+ * @param {string} page
+ * @returns {void}
  */
-async function fetchButtonsJSON() {
-  let response = await fetch(`${HOST}/api/buttons`);
+function showPage(page) {
+  let url = new URL(location.href);
+  if (page === "main") {
+    url.searchParams.delete("page");
+  } else {
+    url.searchParams.set("page", page);
+  }
+  location.replace(url);
+}
+
+/**
+ * Fetch buttons changed after a version, all of them if it's -1
+ * @param {number} since
+ * @returns {Promise<Delta>}
+ */
+async function fetchButtonsDelta(since) {
+  let response = await fetch(
+    `${HOST}/api/buttons_nonblank?since=${since}&page=${PAGE}`,
+    { headers: { Accept: ACCEPT_BUTTONS } },
+  );
+  if (response.status === 404 && PAGE !== "main") {
+    // Page was removed from config
+    showPage("main");
+  }
   if (!response.ok) {
     console.error("Failed to fetch buttons");
-    return [];
+    return { version: since, full: false, buttons: [] };
   }
-  let data = await response.json();
-  return data;
+  let type = response.headers.get("Content-Type") || "";
+  if (type.startsWith(FRAME_TYPE)) {
+    return decodeFrame(await response.arrayBuffer());
+  }
+  return JSONToDelta(await response.json());
 }
 
 /**
@@ -361,7 +530,211 @@ async function fetchButtonsJSON() {
  * @returns {Array<Button>}
  */
 function JSONToButtons(data) {
-  return data.map((button) => new Button(button.id, button.text));
+  return data.map((button) => new Button(button.id, button.text, button.icon));
+}
+
+/**
+ * @param {JSONDelta} data
+ * @returns {Delta}
+ */
+function JSONToDelta(data) {
+  return { ...data, buttons: JSONToButtons(data.buttons) };
+}
+
+// Binary button frames, see `pydeck/wire.py`
+const FRAME_TYPE = "application/x-msgpack";
+const ACCEPT_BUTTONS =
+  clientConfig.format === "msgpack"
+    ? `${FRAME_TYPE}, application/json;q=0.9`
+    : "application/json";
+
+const textDecoder = new TextDecoder();
+
+/**
+ * MessagePack reader over a buffer, values are read in place
+ */
+class FrameReader {
+  /**
+   * @param {ArrayBuffer} buffer
+   */
+  constructor(buffer) {
+    this.view = new DataView(buffer);
+    this.bytes = new Uint8Array(buffer);
+    this.pos = 0;
+  }
+  /**
+   * @param {number} size bytes
+   * @returns {number}
+   */
+  uint(size) {
+    let view = this.view;
+    let pos = this.pos;
+    this.pos += size;
+    switch (size) {
+      case 1:
+        return view.getUint8(pos);
+      case 2:
+        return view.getUint16(pos);
+      case 4:
+        return view.getUint32(pos);
+      default:
+        // Exact up to 2^53, enough for versions (ms timestamps)
+        return view.getUint32(pos) * 2 ** 32 + view.getUint32(pos + 4);
+    }
+  }
+  /**
+   * @param {number} size bytes
+   * @returns {number}
+   */
+  int(size) {
+    let view = this.view;
+    let pos = this.pos;
+    this.pos += size;
+    switch (size) {
+      case 1:
+        return view.getInt8(pos);
+      case 2:
+        return view.getInt16(pos);
+      case 4:
+        return view.getInt32(pos);
+      default:
+        return view.getInt32(pos) * 2 ** 32 + view.getUint32(pos + 4);
+    }
+  }
+  /**
+   * @param {number} length bytes
+   * @returns {string}
+   */
+  str(length) {
+    let start = this.pos;
+    this.pos += length;
+    return textDecoder.decode(this.bytes.subarray(start, this.pos));
+  }
+  /**
+   * Read array header
+   * @returns {number} length
+   */
+  arrayLength() {
+    let byte = this.uint(1);
+    if ((byte & 0xf0) === 0x90) return byte & 0x0f;
+    if (byte === 0xdc) return this.uint(2);
+    if (byte === 0xdd) return this.uint(4);
+    throw new Error(`Expected array, got 0x${byte.toString(16)}`);
+  }
+  /**
+   * @returns {any}
+   */
+  read() {
+    let byte = this.uint(1);
+    if (byte < 0x80) return byte;
+    if (byte >= 0xe0) return byte - 0x100;
+    if ((byte & 0xe0) === 0xa0) return this.str(byte & 0x1f);
+    if ((byte & 0xf0) === 0x90) return this.array(byte & 0x0f);
+    if ((byte & 0xf0) === 0x80) return this.map(byte & 0x0f);
+    switch (byte) {
+      case 0xc0:
+        return null;
+      case 0xc2:
+        return false;
+      case 0xc3:
+        return true;
+      case 0xc4:
+      case 0xc5:
+      case 0xc6: {
+        let length = this.uint(1 << (byte - 0xc4));
+        let start = this.pos;
+        this.pos += length;
+        return this.bytes.subarray(start, this.pos);
+      }
+      case 0xca:
+        this.pos += 4;
+        return this.view.getFloat32(this.pos - 4);
+      case 0xcb:
+        this.pos += 8;
+        return this.view.getFloat64(this.pos - 8);
+      case 0xcc:
+      case 0xcd:
+      case 0xce:
+      case 0xcf:
+        return this.uint(1 << (byte - 0xcc));
+      case 0xd0:
+      case 0xd1:
+      case 0xd2:
+      case 0xd3:
+        return this.int(1 << (byte - 0xd0));
+      case 0xd9:
+      case 0xda:
+      case 0xdb:
+        return this.str(this.uint(1 << (byte - 0xd9)));
+      case 0xdc:
+        return this.array(this.uint(2));
+      case 0xdd:
+        return this.array(this.uint(4));
+      case 0xde:
+        return this.map(this.uint(2));
+      case 0xdf:
+        return this.map(this.uint(4));
+    }
+    throw new Error(`Unsupported MessagePack type 0x${byte.toString(16)}`);
+  }
+  /**
+   * @param {number} length
+   * @returns {Array<any>}
+   */
+  array(length) {
+    let result = new Array(length);
+    for (let i = 0; i < length; i++) {
+      result[i] = this.read();
+    }
+    return result;
+  }
+  /**
+   * @param {number} length
+   * @returns {Dict<any>}
+   */
+  map(length) {
+    /** @type {Dict<any>} */
+    let result = {};
+    for (let i = 0; i < length; i++) {
+      let key = this.read();
+      result[key] = this.read();
+    }
+    return result;
+  }
+}
+
+/**
+ * Decode binary frame `[version, full, styles, buttons, removed]`,
+ * buttons are created straight from the flat list
+ * @param {ArrayBuffer} buffer
+ * @returns {Delta}
+ */
+function decodeFrame(buffer) {
+  let reader = new FrameReader(buffer);
+  reader.arrayLength();
+  let version = reader.read();
+  let full = reader.read();
+  reader.read(); // Style table, the web client uses its own styles
+
+  let count = reader.arrayLength() / 4;
+  let buttons = new Array(count);
+  for (let i = 0; i < count; i++) {
+    let id = reader.read();
+    let text = reader.read();
+    reader.read(); // Style index
+    let icon = reader.read();
+    buttons[i] = new Button([id >> 16, id & 0xffff], text, icon ?? undefined);
+  }
+
+  let removedCount = reader.arrayLength();
+  /** @type {Array<[number, number]>} */
+  let removed = new Array(removedCount);
+  for (let i = 0; i < removedCount; i++) {
+    let id = reader.read();
+    removed[i] = [id >> 16, id & 0xffff];
+  }
+
+  return { version, full, buttons, removed };
 }
 
 /**
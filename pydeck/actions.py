@@ -0,0 +1,279 @@
+"""Button actions execution"""
+
+from __future__ import annotations
+
+__all__ = ["ActionExecutor", "ActionStats", "ClickEvent", "Debouncer"]
+
+import collections
+import logging
+import threading
+import time
+import typing as t
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+from pydeck.metrics import NULL_REGISTRY
+
+if t.TYPE_CHECKING:
+    from collections.abc import Hashable
+
+    from pydeck.metrics import Histogram, Registry
+    from pydeck.typing import ActionCallable
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class ClickEvent:
+    """Click received from a client
+
+    Timestamps are `time.time()` seconds. `status` goes from `queued`
+    to `dispatched` and then `completed` or `failed`, or ends as
+    `debounced`, `invalid`, `ignored` (button has no action) or `rejected`
+    (action busy). `done` is set once it won't change anymore.
+    """
+
+    data: dict[str, t.Any]
+    received: float = field(default_factory=time.time)
+    dispatched: float | None = None
+    completed: float | None = None
+    event_id: t.Any = None  # Set by the client, echoed in the ack
+    status: str = "queued"
+    done: threading.Event = field(default_factory=threading.Event, repr=False)
+
+    def finish(self, status: str) -> None:
+        self.status = status
+        self.done.set()
+
+    def ack(self) -> dict[str, t.Any]:
+        """Acknowledgement for the client, timestamps in milliseconds"""
+        return {
+            "id": self.event_id,
+            "status": self.status,
+            "received": _milliseconds(self.received),
+            "dispatched": _milliseconds(self.dispatched),
+            "completed": _milliseconds(self.completed),
+        }
+
+
+def _milliseconds(timestamp: float | None) -> float | None:
+    return None if timestamp is None else round(timestamp * 1000, 3)
+
+
+class Debouncer:
+    """Drops repeated events with the same key within `window` seconds"""
+
+    window: float
+    _last: dict[Hashable, float]
+    _lock: threading.Lock
+
+    def __init__(self, window: float) -> None:
+        self.window = window
+        self._last = {}
+        self._lock = threading.Lock()
+
+    def accept(self, key: Hashable, timestamp: float) -> bool:
+        """Record event at `timestamp` (seconds)
+
+        Returns False if it repeats an accepted one within the window
+        """
+        with self._lock:
+            last = self._last.get(key)
+            if last is not None and abs(timestamp - last) < self.window:
+                return False
+
+            self._last[key] = timestamp
+
+            if len(self._last) > 1024:
+                self._last = {
+                    k: v for k, v in self._last.items() if timestamp - v < self.window
+                }
+
+        return True
+
+
+@dataclass(slots=True)
+class ActionStats:
+    """Click-to-completion statistics of an action"""
+
+    calls: int = 0
+    errors: int = 0
+    rejected: int = 0
+    total_latency: float = 0
+    max_latency: float = 0
+    last_latency: float = 0
+
+
+@dataclass(slots=True)
+class _Call:
+    name: str
+    func: ActionCallable
+    kwargs: dict[str, t.Any]
+    event: ClickEvent
+
+
+@dataclass(slots=True)
+class _Slot:
+    """Running and waiting calls of an action"""
+
+    running: int = 0
+    pending: collections.deque[_Call] = field(default_factory=collections.deque)
+
+
+class ActionExecutor:
+    """Runs actions in a thread pool, off the render path
+
+    Each action runs at most `concurrency` (or its entry in `limits`) calls
+    at once; up to `queue_size` more wait for a free slot, further calls
+    are rejected.
+    """
+
+    concurrency: int
+    queue_size: int
+    limits: dict[str, int]
+    stats: dict[str, ActionStats]
+    on_done: t.Callable[[], None] | None
+    _slots: dict[str, _Slot]
+    _executor: ThreadPoolExecutor
+    _lock: threading.Lock
+    _latency: Histogram
+
+    def __init__(
+        self,
+        workers: int,
+        concurrency: int = 1,
+        queue_size: int = 4,
+        limits: dict[str, int] | None = None,
+        on_done: t.Callable[[], None] | None = None,
+    ) -> None:
+        """Create executor
+
+        Args:
+            workers: number of threads running actions
+            concurrency: default number of concurrent calls of one action
+            queue_size: number of calls of one action waiting for a slot
+            limits: per-action concurrency, action name -> calls
+            on_done: called (from worker thread) after each action
+        """
+        self.concurrency = concurrency
+        self.queue_size = queue_size
+        self.limits = limits or {}
+        self.stats = {}
+        self.on_done = on_done
+        self._slots = {}
+        self._executor = ThreadPoolExecutor(workers, thread_name_prefix="action")
+        self._lock = threading.Lock()
+        self.instrument(NULL_REGISTRY)
+
+    def instrument(self, metrics: Registry) -> None:
+        """Collect action metrics into registry"""
+        self._latency = metrics.histogram(
+            "action_latency_seconds",
+            "Time from click to action completion",
+            ["action"],
+        )
+        metrics.callback(
+            "counter",
+            "action_errors_total",
+            "Actions which raised an exception",
+            lambda: {(name,): stats.errors for name, stats in list(self.stats.items())},
+            ["action"],
+        )
+        metrics.callback(
+            "counter",
+            "action_rejected_total",
+            "Action calls rejected because the action was busy",
+            lambda: {
+                (name,): stats.rejected for name, stats in list(self.stats.items())
+            },
+            ["action"],
+        )
+        metrics.callback(
+            "gauge",
+            "action_pending",
+            "Action calls waiting for a free slot",
+            lambda: {
+                (name,): len(slot.pending) for name, slot in list(self._slots.items())
+            },
+            ["action"],
+        )
+
+    def submit(
+        self,
+        name: str,
+        func: ActionCallable,
+        kwargs: dict[str, t.Any],
+        event: ClickEvent,
+    ) -> bool:
+        """Run action for click event
+
+        Returns whether the call was accepted
+        """
+        call = _Call(name, func, kwargs, event)
+
+        with self._lock:
+            slot = self._slots.setdefault(name, _Slot())
+            stats = self.stats.setdefault(name, ActionStats())
+
+            if slot.running < self.limits.get(name, self.concurrency):
+                slot.running += 1
+            elif len(slot.pending) < self.queue_size:
+                slot.pending.append(call)
+                return True
+            else:
+                stats.rejected += 1
+                logger.warning("Action '%s' is busy, call rejected", name)
+                event.finish("rejected")
+                return False
+
+        self._start(call)
+        return True
+
+    def shutdown(self) -> None:
+        """Stop accepting actions, don't wait for running ones"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _start(self, call: _Call) -> None:
+        call.event.dispatched = time.time()
+        call.event.status = "dispatched"
+        self._executor.submit(self._run, call)
+
+    def _run(self, call: _Call) -> None:
+        error = False
+
+        try:
+            call.func(**call.kwargs)
+        except Exception:
+            # We need to catch plugin-generated exceptions and
+            # log them to the user
+            error = True
+            logger.exception("Action '%s' error", call.name)
+        finally:
+            call.event.completed = time.time()
+            self._finish(call, error=error)
+            call.event.finish("failed" if error else "completed")
+
+        if self.on_done:
+            self.on_done()
+
+    def _finish(self, call: _Call, *, error: bool) -> None:
+        latency = call.event.completed - call.event.received  # type: ignore[reportOperatorIssue]
+        logger.debug("Action '%s' completed in %.3fs", call.name, latency)
+        self._latency.observe(latency, call.name)
+
+        with self._lock:
+            stats = self.stats[call.name]
+            stats.calls += 1
+            stats.errors += error
+            stats.total_latency += latency
+            stats.max_latency = max(stats.max_latency, latency)
+            stats.last_latency = latency
+
+            slot = self._slots[call.name]
+            if slot.pending:
+                next_call = slot.pending.popleft()
+            else:
+                slot.running -= 1
+                return
+
+        self._start(next_call)
@@ -0,0 +1,64 @@
+"""Shared asyncio event loop"""
+
+from __future__ import annotations
+
+__all__ = ["EventLoopThread"]
+
+import asyncio
+import threading
+import typing as t
+
+if t.TYPE_CHECKING:
+    from collections.abc import Coroutine
+    from concurrent.futures import Future
+
+T = t.TypeVar("T")
+
+
+class EventLoopThread:
+    """asyncio event loop running in a daemon thread
+
+    Started on first use, so decks without async plugins don't run it
+    """
+
+    _loop: asyncio.AbstractEventLoop | None
+    _thread: threading.Thread | None
+    _lock: threading.Lock
+
+    def __init__(self) -> None:
+        self._loop = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """Running event loop"""
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=self._loop.run_forever,
+                    name="asyncio",
+                    daemon=True,
+                )
+                self._thread.start()
+
+        return self._loop
+
+    def submit(self, coro: Coroutine[t.Any, t.Any, T]) -> Future[T]:
+        """Schedule coroutine on the loop (thread-safe)"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro: Coroutine[t.Any, t.Any, T]) -> T:
+        """Run coroutine on the loop, wait for result
+
+        Must not be called from the loop thread
+        """
+        return self.submit(coro).result()
+
+    def stop(self) -> None:
+        """Stop the loop, pending tasks are abandoned"""
+        with self._lock:
+            if self._loop is not None:
+                self._loop.call_soon_threadsafe(self._loop.stop)
+                self._loop = None
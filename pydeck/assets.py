@@ -0,0 +1,174 @@
+"""Static web interface assets
+
+Assets are read, fingerprinted and compressed once, when the web
+interface starts. `index.html` references fingerprinted URLs which are
+cached by clients forever, small assets are inlined into it, so a cold
+load takes as few requests as possible.
+"""
+
+from __future__ import annotations
+
+__all__ = ["Asset", "AssetBundle", "client_config_js"]
+
+import gzip
+import hashlib
+import json
+import logging
+import mimetypes
+import re
+import typing as t
+from dataclasses import dataclass
+from pathlib import Path
+
+try:
+    import brotli  # type: ignore[reportMissingImports]
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+MIN_COMPRESS_SIZE = 256  # Smaller bodies aren't worth compressing
+
+# Hosts meaning "all interfaces", clients use the host they loaded the page from
+_WILDCARD_HOSTS = ("", "0.0.0.0", "::")  # noqa: S104
+
+_SCRIPT_RE = re.compile(r'<script src="(?P<name>[^":]+)"></script>')
+_STYLESHEET_RE = re.compile(r'<link rel="stylesheet" href="(?P<name>[^":]+)">')
+
+
+@dataclass(frozen=True, slots=True)
+class Asset:
+    """File body with its compressed forms"""
+
+    name: str
+    content_type: str
+    etag: str
+    encodings: dict[str, bytes]  # Content-Encoding -> body, best first
+
+    @classmethod
+    def create(cls, name: str, body: bytes, content_type: str | None = None) -> Asset:
+        """Compress body with every available encoding which makes it smaller"""
+        if content_type is None:
+            guessed, _ = mimetypes.guess_type(name)
+            content_type = guessed or "application/octet-stream"
+        if content_type.startswith("text/") or content_type.endswith("javascript"):
+            content_type += "; charset=utf-8"
+
+        encodings: dict[str, bytes] = {}
+
+        if len(body) >= MIN_COMPRESS_SIZE:
+            if brotli is not None:
+                encodings["br"] = brotli.compress(body)
+            encodings["gzip"] = gzip.compress(body, compresslevel=9, mtime=0)
+
+        encodings = {k: v for k, v in encodings.items() if len(v) < len(body)}
+        encodings["identity"] = body
+
+        etag = hashlib.blake2b(body, digest_size=8).hexdigest()
+
+        return cls(name, content_type, etag, encodings)
+
+    @property
+    def fingerprinted_name(self) -> str:
+        """Name with content hash (`render.js` -> `render.<hash>.js`)"""
+        stem, dot, suffix = self.name.rpartition(".")
+        if not dot:
+            return f"{self.name}.{self.etag}"
+        return f"{stem}.{self.etag}.{suffix}"
+
+
+class AssetBundle:
+    """Assets of a directory, by name and by fingerprinted name"""
+
+    assets: dict[str, Asset]
+    immutable: dict[str, Asset]
+
+    def __init__(
+        self,
+        directory: str,
+        overrides: dict[str, str] | None = None,
+        inline_limit: int = 0,
+    ) -> None:
+        """Read and compress assets
+
+        Args:
+            directory: directory with assets
+            overrides: generated assets, name -> content
+            inline_limit: assets up to this size (bytes) referenced
+                from HTML files are inlined
+        """
+        root = Path(directory)
+        sources = {
+            path.relative_to(root).as_posix(): path.read_bytes()
+            for path in sorted(root.rglob("*"))
+            if path.is_file()
+        }
+        sources.update({k: v.encode() for k, v in (overrides or {}).items()})
+
+        self.assets = {}
+        self.immutable = {}
+
+        for name, body in sources.items():
+            if not name.endswith(".html"):
+                self._add(Asset.create(name, body))
+
+        for name, body in sources.items():
+            if name.endswith(".html"):
+                html = self._link(body.decode(), inline_limit)
+                self._add(Asset.create(name, html.encode()))
+
+        logger.debug("Assets: %s", list(self.assets))
+
+    def get(self, name: str) -> tuple[Asset, bool] | None:
+        """Get asset and whether it's immutable (requested by fingerprinted name)"""
+        if asset := self.immutable.get(name):
+            return asset, True
+        if asset := self.assets.get(name):
+            return asset, False
+        return None
+
+    def _add(self, asset: Asset) -> None:
+        self.assets[asset.name] = asset
+        self.immutable[asset.fingerprinted_name] = asset
+
+    def _link(self, html: str, inline_limit: int) -> str:
+        """Inline small scripts and stylesheets, fingerprint references to others"""
+
+        def script(match: re.Match[str]) -> str:
+            if not (asset := self.assets.get(match["name"])):
+                return match[0]
+            body = asset.encodings["identity"]
+            if len(body) <= inline_limit:
+                code = re.sub(
+                    "</script", r"<\\/script", body.decode(), flags=re.IGNORECASE
+                )
+                return f"<script>{code}</script>"
+            return f'<script src="{asset.fingerprinted_name}"></script>'
+
+        def stylesheet(match: re.Match[str]) -> str:
+            if not (asset := self.assets.get(match["name"])):
+                return match[0]
+            body = asset.encodings["identity"]
+            if len(body) <= inline_limit:
+                return f"<style>{body.decode()}</style>"
+            return f'<link rel="stylesheet" href="{asset.fingerprinted_name}">'
+
+        html = _SCRIPT_RE.sub(script, html)
+        return _STYLESHEET_RE.sub(stylesheet, html)
+
+
+def client_config_js(config: dict[str, t.Any]) -> str:
+    """Web client config (`config.js`) from server config"""
+    host = config["client"]["address"] or config["server"]["host"]
+    address = "location.hostname" if host in _WILDCARD_HOSTS else json.dumps(host)
+
+    return (
+        "const config = {\n"
+        f"  address: {address},\n"
+        f"  port: {json.dumps(config['server']['port'])},\n"
+        '  // "stream" (server push) or "poll"\n'
+        f"  mode: {json.dumps(config['client']['mode'])},\n"
+        '  // "json" or "msgpack" (compact binary buttons)\n'
+        f"  format: {json.dumps(config['client']['format'])},\n"
+        "};\n"
+    )
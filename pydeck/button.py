@@ -3,24 +3,85 @@
 from __future__ import annotations
 
 import typing as t
+from dataclasses import dataclass, field
 
+from pydeck.codec import dumps
 from pydeck.config import defaults
+from pydeck.template import Template
 
+if t.TYPE_CHECKING:
+    from collections.abc import Mapping
 
-class Button:
-    """Deck button data structure"""
 
-    text: str
+@dataclass(frozen=True, slots=True)
+class Style:
+    """Button text style
+
+    Interned: buttons with the same style share one instance,
+    use `Style.get` to create
+    """
 
     text_align: str
     font_family: str
     font_size: str
+    json: bytes = field(compare=False, repr=False)
+
+    _interned: t.ClassVar[dict[tuple[str, str, str], Style]] = {}
 
-    icon: str | None
+    @classmethod
+    def get(
+        cls,
+        text_align: str | None = None,
+        font_family: str | None = None,
+        font_size: str | None = None,
+    ) -> Style:
+        """Get shared style, `None` values are taken from defaults"""
+        key = (
+            text_align or defaults["button"]["align"],
+            font_family or defaults["button"]["font"],
+            font_size or defaults["button"]["size"],
+        )
+
+        if (style := cls._interned.get(key)) is None:
+            # Serialized members, to be joined with others
+            fragment = dumps(
+                dict(zip(("text_align", "font_family", "font_size"), key)),
+            )[1:-1]
+            style = cls._interned.setdefault(key, cls(*key, fragment))
+
+        return style
+
+
+class Button:
+    """Deck button data structure
+
+    Serialized forms are cached until the button changes
+    """
+
+    __slots__ = (
+        "_dict",
+        "_icon",
+        "_json",
+        "_rendered",
+        "_style",
+        "_text",
+        "action",
+        "action_args",
+        "template",
+    )
+
+    template: Template
 
     action: str | None
     action_args: dict[str, t.Any]
 
+    _text: str
+    _style: Style
+    _icon: str | None
+    _dict: dict[str, t.Any] | None
+    _json: bytes | None
+    _rendered: Button | None
+
     def __init__(
         self,
         text: str = "",
@@ -29,30 +90,120 @@ class Button:
         font_size: str | None = None,
         action: str | None = None,
         action_args: dict[str, t.Any] | None = None,
+        icon: str | None = None,
     ) -> None:
-        self.text = text
-
-        self.text_align = text_align or defaults["button"]["align"]
-        self.font_family = font_family or defaults["button"]["font"]
-        self.font_size = font_size or defaults["button"]["size"]
+        self._text = text
+        self._style = Style.get(text_align, font_family, font_size)
+        self._icon = icon
+        self._dict = self._json = self._rendered = None
+        self.template = Template(text)
 
         self.action = action
         self.action_args = action_args or {}
 
+    @property
+    def text(self) -> str:
+        return self._text
+
+    @text.setter
+    def text(self, value: str) -> None:
+        """Set text, its template and variables are parsed again
+
+        Pages index variables in `Page.set_buttons`, set buttons again
+        after changing them
+        """
+        self.template = Template(value)
+        self._text = value
+        self._dict = self._json = self._rendered = None
+
+    @property
+    def style(self) -> Style:
+        return self._style
+
+    @style.setter
+    def style(self, value: Style) -> None:
+        self._style = value
+        self._dict = self._json = self._rendered = None
+
+    @property
+    def icon(self) -> str | None:
+        """Icon, file name in config, then its URL (`IconStore.url`)"""
+        return self._icon
+
+    @icon.setter
+    def icon(self, value: str | None) -> None:
+        self._icon = value
+        self._dict = self._json = self._rendered = None
+
+    @property
+    def text_align(self) -> str:
+        return self.style.text_align
+
+    @text_align.setter
+    def text_align(self, value: str) -> None:
+        self.style = Style.get(value, self.font_family, self.font_size)
+
+    @property
+    def font_family(self) -> str:
+        return self.style.font_family
+
+    @font_family.setter
+    def font_family(self, value: str) -> None:
+        self.style = Style.get(self.text_align, value, self.font_size)
+
+    @property
+    def font_size(self) -> str:
+        return self.style.font_size
+
+    @font_size.setter
+    def font_size(self, value: str) -> None:
+        self.style = Style.get(self.text_align, self.font_family, value)
+
     def as_dict(self) -> dict[str, t.Any]:
-        """Return properties of a button as dictionary"""
-        return {
-            "text": self.text,
-            "text_align": self.text_align,
-            "font_family": self.font_family,
-            "font_size": self.font_size,
-            # "action": self.action,
-            # "action_args": self.action_args,
-        }
+        """Return properties of a button as dictionary
+
+        Cached, must not be mutated
+        """
+        if self._dict is None:
+            self._dict = {
+                "text": self.text,
+                "text_align": self.text_align,
+                "font_family": self.font_family,
+                "font_size": self.font_size,
+                # "action": self.action,
+                # "action_args": self.action_args,
+            }
+            if self.icon:
+                self._dict["icon"] = self.icon
+
+        return self._dict
+
+    def as_json(self) -> bytes:
+        """Serialized `as_dict` members, without braces
+
+        Cached, so snapshots join fragments instead of serializing every button
+        """
+        if self._json is None:
+            self._json = b'"text":%s,%s' % (dumps(self.text), self.style.json)
+            if self.icon:
+                self._json += b',"icon":%s' % dumps(self.icon)
+
+        return self._json
 
     def __repr__(self) -> str:
         return str(self.as_dict())
 
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Button):
+            return NotImplemented
+
+        return self._key() == other._key()
+
+    __hash__ = None  # type: ignore[reportAssignmentType]
+
+    def _key(self) -> tuple[t.Any, ...]:
+        return (self.text, self.style, self.icon, self.action, self.action_args)
+
     def format(self, **kwargs: object) -> None:
         """Format self inner text with variables
 
@@ -60,6 +211,39 @@ class Button:
         """
         self.text = self.text.format(**kwargs)
 
+    def render(
+        self,
+        variables: Mapping[str, t.Any],
+        missing: str | None = None,
+    ) -> Button:
+        """Render template with variables
+
+        Missing variables are replaced with `missing` text if given.
+        Returns new button, self keeps its text. Previous result is
+        returned again if the text didn't change.
+        """
+        text = self.template.render(variables, missing)
+
+        if (rendered := self._rendered) is not None and rendered.text == text:
+            return rendered
+
+        # Rendered text is not a template, don't parse it
+        rendered = Button.__new__(Button)
+        rendered._text = text  # noqa: SLF001
+        rendered._style = self._style  # noqa: SLF001
+        rendered._icon = self._icon  # noqa: SLF001
+        rendered._dict = rendered._json = rendered._rendered = None  # noqa: SLF001
+        rendered.template = self.template
+        rendered.action = self.action
+        rendered.action_args = self.action_args
+        self._rendered = rendered
+        return rendered
+
+    @property
+    def variables(self) -> frozenset[str]:
+        """Names of variables used by the button"""
+        return self.template.variables
+
     def formatted(self, **kwargs: object) -> str:
         """Format inner text with variables
 
@@ -0,0 +1,151 @@
+"""Cached plugin variables
+
+A plugin method decorated with `cached` computes one variable. The
+plugin manager calls it only when its value expires, after `ttl`
+seconds or at wall-clock boundaries (`align`), instead of on every
+update. The previous value stays published while a new one is computed
+(stale-while-revalidate), for at most `stale` seconds past expiry.
+
+```python
+class Main(DeckPlugin):
+    @cached(align=1)  # On every second of the clock
+    def time(self) -> str:
+        return datetime.datetime.now().strftime("%H:%M:%S")
+```
+"""
+
+from __future__ import annotations
+
+__all__ = ["CachePolicy", "CachedVariable", "cached", "cached_variables"]
+
+import inspect
+import math
+import time
+import typing as t
+from dataclasses import dataclass
+
+F = t.TypeVar("F", bound=t.Callable[..., t.Any])
+
+ALIGN_DELAY = 0.005  # Run aligned refreshes just after the boundary
+
+_POLICY_ATTR = "__pydeck_cache__"
+_MISSING: t.Final = object()
+
+
+@dataclass(frozen=True, slots=True)
+class CachePolicy:
+    """When a cached variable expires
+
+    Args:
+        name: variable name
+        ttl: seconds a value is fresh
+        align: refresh at wall-clock multiples of `align` seconds
+            (1 - every second, 60 - every minute), after `offset`
+        offset: shift of aligned boundaries, seconds
+        stale: seconds past expiry the previous value is kept while
+            a new one is computed, then it's removed
+    """
+
+    name: str
+    ttl: float | None = None
+    align: float | None = None
+    offset: float = 0
+    stale: float = math.inf
+
+    @property
+    def interval(self) -> float:
+        return t.cast("float", self.align or self.ttl)
+
+    def expires(self, now: float) -> float:
+        """Expiry (`time.monotonic`) of a value computed at `now`"""
+        if self.align is None:
+            return now + self.interval
+
+        wall = time.time() - self.offset
+        return now + self.align - wall % self.align + ALIGN_DELAY
+
+
+class CachedVariable:
+    """Value of a cached variable and its computing function"""
+
+    policy: CachePolicy
+    func: t.Callable[[], t.Any]
+    value: t.Any
+    expires: float
+
+    def __init__(self, policy: CachePolicy, func: t.Callable[[], t.Any]) -> None:
+        self.policy = policy
+        self.func = func
+        self.value = _MISSING
+        self.expires = 0
+
+    @property
+    def has_value(self) -> bool:
+        return self.value is not _MISSING
+
+    @property
+    def is_async(self) -> bool:
+        return inspect.iscoroutinefunction(self.func)
+
+    @property
+    def drop_at(self) -> float:
+        """Time (`time.monotonic`) when the value is too stale to keep"""
+        return self.expires + self.policy.stale
+
+    def set(self, value: t.Any) -> None:  # noqa: ANN401
+        self.value = value
+        self.expires = self.policy.expires(time.monotonic())
+
+    def drop(self) -> None:
+        self.value = _MISSING
+
+
+def cached(
+    ttl: float | None = None,
+    *,
+    align: float | None = None,
+    offset: float = 0,
+    stale: float = math.inf,
+    name: str | None = None,
+) -> t.Callable[[F], F]:
+    """Compute plugin variable with method, only when it expires
+
+    Args:
+        ttl: seconds a value is fresh
+        align: refresh at wall-clock multiples of `align` seconds instead
+        offset: shift of aligned boundaries, seconds
+        stale: seconds past expiry the previous value is kept,
+            forever by default
+        name: variable name, method name without leading `_` by default
+    """
+    if (ttl is None) == (align is None):
+        msg = "Specify either ttl or align"
+        raise ValueError(msg)
+
+    if (ttl or align or 0) <= 0:
+        msg = "Cache interval must be positive"
+        raise ValueError(msg)
+
+    def decorator(func: F) -> F:
+        policy = CachePolicy(
+            name or func.__name__.lstrip("_"),
+            ttl,
+            align,
+            offset,
+            stale,
+        )
+        setattr(func, _POLICY_ATTR, policy)
+        return func
+
+    return decorator
+
+
+def cached_variables(plugin: object) -> dict[str, CachedVariable]:
+    """Cached variables declared by plugin's methods, by name"""
+    variables: dict[str, CachedVariable] = {}
+
+    for attr, member in inspect.getmembers(type(plugin), callable):
+        if (policy := getattr(member, _POLICY_ATTR, None)) is not None:
+            variables[policy.name] = CachedVariable(policy, getattr(plugin, attr))
+
+    return variables
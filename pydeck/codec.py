@@ -0,0 +1,111 @@
+"""JSON serialization and response compression
+
+Uses `orjson` if it's installed, stdlib `json` otherwise. Both produce
+compact UTF-8 output, so responses are the same with either.
+"""
+
+from __future__ import annotations
+
+__all__ = [
+    "COMPRESSIONS",
+    "JSON_BACKEND",
+    "CompressionCache",
+    "JSONProvider",
+    "compress",
+    "dumps",
+    "loads",
+]
+
+import collections
+import gzip
+import json
+import threading
+import typing as t
+import zlib
+
+from flask.json.provider import JSONProvider as _FlaskJSONProvider
+
+try:
+    import orjson  # type: ignore[reportMissingImports]
+except ImportError:
+    orjson = None
+
+if t.TYPE_CHECKING:
+    from collections.abc import Hashable
+
+# Supported Content-Encodings, preferred first
+COMPRESSIONS = ("gzip", "deflate")
+
+COMPRESS_LEVEL = 6  # Fast enough to run per request, most of the gain of 9
+
+JSON_BACKEND = "orjson" if orjson is not None else "json"
+
+
+def dumps(obj: t.Any) -> bytes:  # noqa: ANN401
+    """Serialize to compact UTF-8 JSON"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def loads(data: bytes | str) -> t.Any:  # noqa: ANN401
+    if orjson is not None:
+        return orjson.loads(data)
+
+    return json.loads(data)
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    """Compress body with Content-Encoding `gzip` or `deflate`"""
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=COMPRESS_LEVEL, mtime=0)
+    if encoding == "deflate":
+        # HTTP "deflate" is zlib-wrapped
+        return zlib.compress(body, COMPRESS_LEVEL)
+
+    msg = f"Unsupported encoding: {encoding}"
+    raise ValueError(msg)
+
+
+class CompressionCache:
+    """Compressed forms of recently sent bodies
+
+    Snapshots are sent to every client unchanged, so each version is
+    compressed once per encoding
+    """
+
+    maxsize: int
+    _cache: collections.OrderedDict[tuple[Hashable, str], bytes]
+    _lock: threading.Lock
+
+    def __init__(self, maxsize: int = 256) -> None:
+        self.maxsize = maxsize
+        self._cache = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def compress(self, key: Hashable, body: bytes, encoding: str) -> bytes:
+        """Get body compressed with encoding, `key` identifies the body"""
+        with self._lock:
+            if (cached := self._cache.get((key, encoding))) is not None:
+                self._cache.move_to_end((key, encoding))
+                return cached
+
+        compressed = compress(body, encoding)
+
+        with self._lock:
+            self._cache[(key, encoding)] = compressed
+            while len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+
+        return compressed
+
+
+class JSONProvider(_FlaskJSONProvider):
+    """Flask JSON provider using `dumps` and `loads`"""
+
+    def dumps(self, obj: t.Any, **_: t.Any) -> str:  # noqa: ANN401
+        return dumps(obj).decode()
+
+    def loads(self, s: str | bytes, **_: t.Any) -> t.Any:  # noqa: ANN401
+        return loads(s)
@@ -9,7 +9,7 @@ DEFAULTS
 
 from __future__ import annotations
 
-__all__ = ["config", "defaults"]
+__all__ = ["CONFIG_FILE", "config", "defaults", "load_config"]
 
 import json
 import shutil
@@ -23,20 +23,43 @@ defaults: dict[str, Any]
 PATH = __file__.replace("\\", "/").rsplit("/", 1)[0]
 
 _DEFAULT_CONFIG_FILE = f"{PATH}/config.default.json"
-_CONFIG_FILE = f"{PATH}/config.json"
+CONFIG_FILE = f"{PATH}/config.json"
 _DEFAULTS_FILE = f"{PATH}/defaults.json"
 
-with Path(_DEFAULT_CONFIG_FILE).open() as f:
-    default_config = json.load(f)
 
-if (config_path := Path(_CONFIG_FILE)).exists():
+def _merge(base: dict[str, Any], override: dict[str, Any]) -> dict[str, Any]:
+    """Merge configs recursively, so partial user sections keep default keys"""
+    result = base.copy()
+
+    for key, value in override.items():
+        if isinstance(value, dict) and isinstance(result.get(key), dict):
+            result[key] = _merge(result[key], value)  # type: ignore[reportUnknownArgumentType]
+        else:
+            result[key] = value
+
+    return result
+
+
+def load_config() -> dict[str, Any]:
+    """Read `config.json` merged with default configuration
+
+    Creates `config.json` from the default one if it doesn't exist
+    """
+    with Path(_DEFAULT_CONFIG_FILE).open() as f:
+        default = json.load(f)
+
+    if not (config_path := Path(CONFIG_FILE)).exists():
+        shutil.copy(_DEFAULT_CONFIG_FILE, CONFIG_FILE)
+        return default
+
     with config_path.open() as f:
-        config = json.load(f)
-else:
-    shutil.copy(_DEFAULT_CONFIG_FILE, _CONFIG_FILE)
-    config = default_config
+        return _merge(default, json.load(f))
+
+
+with Path(_DEFAULT_CONFIG_FILE).open() as f:
+    default_config = json.load(f)
 
-config = default_config | config
+config = load_config()
 
 with Path(_DEFAULTS_FILE).open() as f:
     defaults = json.load(f)
@@ -0,0 +1,283 @@
+"""Button icons
+
+Icons are served under content-hash URLs (`icons/<hash>/<size>`), which
+never change meaning, so clients cache them forever: bytes are checked
+against the hash before they're served, and URLs are resolved again
+when files change. Each size is resized once, with Pillow if it's
+installed, and kept in a bounded memory cache and an on-disk cache which
+survives restarts.
+"""
+
+from __future__ import annotations
+
+__all__ = ["ICON_SIZES", "Icon", "IconStore"]
+
+import collections
+import hashlib
+import io
+import logging
+import mimetypes
+import threading
+import typing as t
+from dataclasses import dataclass
+from pathlib import Path
+
+try:
+    from PIL import Image  # type: ignore[reportMissingImports]
+except ImportError:
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+# Pixel sizes served, requested sizes are rounded up to one of them
+ICON_SIZES = (32, 48, 64, 96, 128, 192, 256, 384, 512)
+
+_RESIZED_TYPE = "image/png"
+
+
+@dataclass(frozen=True, slots=True)
+class Icon:
+    body: bytes
+    content_type: str
+    etag: str
+
+
+class IconStore:
+    """Icon files by content hash, resized on demand
+
+    Only files resolved with `url` are served.
+    """
+
+    directory: Path
+    cache_dir: Path | None
+    memory_limit: int
+    disk_limit: int
+    _sources: dict[str, Path]
+    _digests: dict[Path, tuple[float, int, str]]
+    _memory: collections.OrderedDict[tuple[str, int], Icon]
+    _memory_size: int
+    _disk_size: int
+    _lock: threading.Lock
+
+    def __init__(
+        self,
+        directory: str,
+        cache_dir: str | None = None,
+        memory_limit: int = 16 << 20,
+        disk_limit: int = 128 << 20,
+    ) -> None:
+        """Create store
+
+        Args:
+            directory: directory relative icon names are looked up in
+            cache_dir: directory of resized icons, no disk cache if None
+            memory_limit: bytes of resized icons kept in memory
+            disk_limit: bytes of resized icons kept in `cache_dir`
+        """
+        self.directory = Path(directory)
+        self.cache_dir = Path(cache_dir) if cache_dir and disk_limit else None
+        self.memory_limit = memory_limit
+        self.disk_limit = disk_limit
+        self._sources = {}
+        self._digests = {}
+        self._memory = collections.OrderedDict()
+        self._memory_size = 0
+        self._disk_size = 0
+        self._lock = threading.Lock()
+
+        if self.cache_dir:
+            try:
+                self.cache_dir.mkdir(parents=True, exist_ok=True)
+                self._disk_size = sum(p.stat().st_size for p in self._cached_files())
+            except OSError as e:
+                logger.warning("Icon cache disabled: %r", e)
+                self.cache_dir = None
+
+        if Image is None:
+            logger.debug("Pillow is not installed, icons are served unresized")
+
+    def url(self, name: str) -> str | None:
+        """Content-hash URL of icon file, None if it can't be read
+
+        Clients append the wanted size in pixels (`<url>/<size>`)
+        """
+        path = self.directory / name
+
+        try:
+            stat = path.stat()
+            known = self._digests.get(path)
+            if known and known[:2] == (stat.st_mtime, stat.st_size):
+                digest = known[2]
+            else:
+                digest = _digest(path.read_bytes())
+        except OSError as e:
+            logger.warning("Icon '%s' can't be read: %r", name, e)
+            return None
+
+        with self._lock:
+            if known and known[2] != digest:
+                # File changed, its old URL is gone
+                self._sources.pop(known[2], None)
+            self._digests[path] = (stat.st_mtime, stat.st_size, digest)
+            self._sources[digest] = path
+
+        return f"icons/{digest}"
+
+    def sources(self) -> dict[Path, tuple[float, int] | None]:
+        """Modification time and size of resolved icon files
+
+        None for files which can't be read. Changes mean URLs have to be
+        resolved again.
+        """
+        state: dict[Path, tuple[float, int] | None] = {}
+
+        for path in list(self._digests):
+            try:
+                stat = path.stat()
+                state[path] = (stat.st_mtime, stat.st_size)
+            except OSError:
+                state[path] = None
+
+        return state
+
+    def get(self, digest: str, size: int) -> Icon | None:
+        """Icon fitting into `size` x `size` pixels, None if it's unknown"""
+        if (path := self._sources.get(digest)) is None:
+            return None
+
+        # Without Pillow every size is the original file
+        size = (
+            next((s for s in ICON_SIZES if s >= size), ICON_SIZES[-1]) if Image else 0
+        )
+        key = (digest, size)
+
+        with self._lock:
+            if (icon := self._memory.get(key)) is not None:
+                self._memory.move_to_end(key)
+                return icon
+
+        icon = self._read_cached(key) or self._create(path, key)
+
+        if icon is not None:
+            self._remember(key, icon)
+
+        return icon
+
+    def _create(self, path: Path, key: tuple[str, int]) -> Icon | None:
+        try:
+            source = path.read_bytes()
+        except OSError as e:
+            logger.warning("Icon '%s' can't be read: %r", path, e)
+            return None
+
+        digest, size = key
+
+        if _digest(source) != digest:
+            logger.warning("Icon '%s' changed since its URL was resolved", path)
+            with self._lock:
+                if self._sources.get(digest) == path:
+                    del self._sources[digest]
+            return None
+
+        if (resized := _resize(source, size)) is None:
+            content_type = mimetypes.guess_type(path.name)[0]
+            return Icon(source, content_type or "application/octet-stream", digest)
+
+        icon = Icon(resized, _RESIZED_TYPE, f"{digest}-{size}")
+        self._write_cached(key, icon.body)
+        return icon
+
+    def _remember(self, key: tuple[str, int], icon: Icon) -> None:
+        with self._lock:
+            if key in self._memory:
+                return
+
+            self._memory[key] = icon
+            self._memory_size += len(icon.body)
+
+            while self._memory_size > self.memory_limit and len(self._memory) > 1:
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_size -= len(evicted.body)
+
+    def _cache_path(self, key: tuple[str, int]) -> Path:
+        return t.cast("Path", self.cache_dir) / f"{key[0]}-{key[1]}.png"
+
+    def _cached_files(self) -> list[Path]:
+        return list(t.cast("Path", self.cache_dir).glob("*.png"))
+
+    def _read_cached(self, key: tuple[str, int]) -> Icon | None:
+        if self.cache_dir is None:
+            return None
+
+        path = self._cache_path(key)
+        try:
+            body = path.read_bytes()
+            path.touch()  # Recently used, pruned last
+        except OSError:
+            return None
+
+        return Icon(body, _RESIZED_TYPE, f"{key[0]}-{key[1]}")
+
+    def _write_cached(self, key: tuple[str, int], body: bytes) -> None:
+        if self.cache_dir is None:
+            return
+
+        try:
+            self._cache_path(key).write_bytes(body)
+        except OSError as e:
+            logger.debug("Failed to write icon cache: %r", e)
+            return
+
+        with self._lock:
+            self._disk_size += len(body)
+            if self._disk_size > self.disk_limit:
+                self._prune()
+
+    def _prune(self) -> None:
+        """Delete least recently used files until cache fits into half the limit"""
+        try:
+            files = sorted(
+                (
+                    (p.stat().st_mtime, p.stat().st_size, p)
+                    for p in self._cached_files()
+                ),
+                key=lambda item: item[0],
+            )
+        except OSError:
+            return
+
+        self._disk_size = sum(size for _, size, _ in files)
+
+        for _, size, path in files:
+            if self._disk_size <= self.disk_limit // 2:
+                break
+            path.unlink(missing_ok=True)
+            self._disk_size -= size
+
+
+def _digest(source: bytes) -> str:
+    return hashlib.blake2b(source, digest_size=8).hexdigest()
+
+
+def _resize(source: bytes, size: int) -> bytes | None:
+    """Downscale image to fit `size`, as PNG
+
+    None if it should be served as is: without Pillow, for vector and
+    animated images, or images which can't be decoded
+    """
+    if Image is None:
+        return None
+
+    try:
+        with Image.open(io.BytesIO(source)) as image:
+            if getattr(image, "is_animated", False):
+                return None
+            image.thumbnail((size, size), Image.Resampling.LANCZOS)
+            if image.mode not in ("RGB", "RGBA", "L", "LA"):
+                image = image.convert("RGBA")  # noqa: PLW2901
+            output = io.BytesIO()
+            image.save(output, "PNG")
+    except (OSError, ValueError):
+        return None
+
+    return output.getvalue()
@@ -0,0 +1,299 @@
+"""Runtime metrics in Prometheus text format
+
+Metrics of a disabled registry are no-ops, so instrumented code costs
+a method call when metrics are off.
+"""
+
+from __future__ import annotations
+
+__all__ = ["NULL_REGISTRY", "Counter", "Gauge", "Histogram", "Registry"]
+
+import bisect
+import math
+import threading
+import time
+import typing as t
+
+if t.TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Iterator
+
+LabelValues: t.TypeAlias = tuple[str, ...]
+Samples: t.TypeAlias = "float | dict[LabelValues, float]"
+
+DEFAULT_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1,
+    2.5,
+    5,
+    10,
+)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple[str, ...], values: LabelValues) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return f"{{{pairs}}}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+class _Metric:
+    type: t.ClassVar[str]
+
+    name: str
+    help: str
+    label_names: tuple[str, ...]
+    _lock: threading.Lock
+
+    def __init__(self, name: str, help_: str, label_names: tuple[str, ...]) -> None:
+        self.name = name
+        self.help = help_
+        self.label_names = label_names
+        self._lock = threading.Lock()
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} {self.type}"
+        yield from self._samples()
+
+    def _samples(self) -> Iterator[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonically increasing value"""
+
+    type = "counter"
+
+    _values: dict[LabelValues, float]
+
+    def __init__(self, name: str, help_: str, label_names: tuple[str, ...]) -> None:
+        super().__init__(name, help_, label_names)
+        self._values = {}
+
+    def inc(self, *label_values: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def _samples(self) -> Iterator[str]:
+        with self._lock:
+            values = tuple(self._values.items())
+
+        for label_values, value in values:
+            labels = _format_labels(self.label_names, label_values)
+            yield f"{self.name}{labels} {_format_value(value)}"
+
+
+class Gauge(Counter):
+    """Value that can go up and down"""
+
+    type = "gauge"
+
+    def set(self, value: float, *label_values: str) -> None:
+        with self._lock:
+            self._values[label_values] = value
+
+
+class Histogram(_Metric):
+    """Distribution of observed values in buckets"""
+
+    type = "histogram"
+
+    buckets: tuple[float, ...]
+    _counts: dict[LabelValues, list[int]]
+    _sums: dict[LabelValues, float]
+
+    def __init__(
+        self,
+        name: str,
+        help_: str,
+        label_names: tuple[str, ...],
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, help_, label_names)
+        self.buckets = (*buckets, math.inf)
+        self._counts = {}
+        self._sums = {}
+
+    def observe(self, value: float, *label_values: str) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+
+        with self._lock:
+            if (counts := self._counts.get(label_values)) is None:
+                counts = self._counts[label_values] = [0] * len(self.buckets)
+                self._sums[label_values] = 0
+            counts[index] += 1
+            self._sums[label_values] += value
+
+    def time(self, *label_values: str) -> _Timer:
+        """Context manager observing its duration"""
+        return _Timer(self, label_values)
+
+    def _samples(self) -> Iterator[str]:
+        with self._lock:
+            series = [
+                (label_values, tuple(counts), self._sums[label_values])
+                for label_values, counts in self._counts.items()
+            ]
+
+        names = (*self.label_names, "le")
+
+        for label_values, counts, total in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                labels = _format_labels(names, (*label_values, _format_value(bound)))
+                yield f"{self.name}_bucket{labels} {cumulative}"
+
+            labels = _format_labels(self.label_names, label_values)
+            yield f"{self.name}_sum{labels} {_format_value(total)}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+
+class _Timer:
+    __slots__ = ("_histogram", "_label_values", "_started")
+
+    def __init__(self, histogram: Histogram, label_values: LabelValues) -> None:
+        self._histogram = histogram
+        self._label_values = label_values
+        self._started = 0.0
+
+    def __enter__(self) -> None:
+        self._started = time.perf_counter()
+
+    def __exit__(self, *_: object) -> None:
+        self._histogram.observe(
+            time.perf_counter() - self._started,
+            *self._label_values,
+        )
+
+
+class _Callback(_Metric):
+    """Metric read from a function when rendered"""
+
+    _func: Callable[[], Samples]
+
+    def __init__(
+        self,
+        type_: str,
+        name: str,
+        help_: str,
+        label_names: tuple[str, ...],
+        func: Callable[[], Samples],
+    ) -> None:
+        super().__init__(name, help_, label_names)
+        self.type = type_  # type: ignore[reportAttributeAccessIssue]
+        self._func = func
+
+    def _samples(self) -> Iterator[str]:
+        values = self._func()
+
+        if not isinstance(values, dict):
+            values = {(): values}
+
+        for label_values, value in values.items():
+            labels = _format_labels(self.label_names, label_values)
+            yield f"{self.name}{labels} {_format_value(value)}"
+
+
+class _NullMetric:
+    """Stand-in for metrics of a disabled registry"""
+
+    def inc(self, *_: str, amount: float = 1) -> None: ...
+
+    def set(self, *_: t.Any) -> None: ...  # noqa: ANN401
+
+    def observe(self, *_: t.Any) -> None: ...  # noqa: ANN401
+
+    def time(self, *_: str) -> _NullTimer:
+        return _NULL_TIMER
+
+
+class _NullTimer:
+    def __enter__(self) -> None: ...
+
+    def __exit__(self, *_: object) -> None: ...
+
+
+_NULL_METRIC = _NullMetric()
+_NULL_TIMER = _NullTimer()
+
+
+class Registry:
+    """Collection of metrics"""
+
+    enabled: bool
+    prefix: str
+    _metrics: list[_Metric]
+
+    def __init__(self, *, enabled: bool = True, prefix: str = "pydeck_") -> None:
+        self.enabled = enabled
+        self.prefix = prefix
+        self._metrics = []
+
+    def counter(self, name: str, help_: str, labels: Iterable[str] = ()) -> Counter:
+        return self._register(Counter(self.prefix + name, help_, tuple(labels)))
+
+    def gauge(self, name: str, help_: str, labels: Iterable[str] = ()) -> Gauge:
+        return self._register(Gauge(self.prefix + name, help_, tuple(labels)))
+
+    def histogram(
+        self,
+        name: str,
+        help_: str,
+        labels: Iterable[str] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(
+            Histogram(self.prefix + name, help_, tuple(labels), buckets),
+        )
+
+    def callback(
+        self,
+        type_: t.Literal["counter", "gauge"],
+        name: str,
+        help_: str,
+        func: Callable[[], Samples],
+        labels: Iterable[str] = (),
+    ) -> None:
+        """Register metric whose value is read from func on render
+
+        func returns a value, or a dict: label values -> value
+        """
+        if self.enabled:
+            self._metrics.append(
+                _Callback(type_, self.prefix + name, help_, tuple(labels), func),
+            )
+
+    def render(self) -> str:
+        """Render metrics in Prometheus text exposition format"""
+        lines = [line for metric in self._metrics for line in metric.render()]
+        return "\n".join(lines) + "\n"
+
+    def _register(self, metric: _Metric) -> t.Any:  # noqa: ANN401
+        if not self.enabled:
+            return _NULL_METRIC
+
+        self._metrics.append(metric)
+        return metric
+
+
+NULL_REGISTRY = Registry(enabled=False)
@@ -0,0 +1,159 @@
+"""Deck pages (profiles)"""
+
+from __future__ import annotations
+
+__all__ = ["DEFAULT_PAGE", "ButtonMatrix", "Page"]
+
+import threading
+import time
+import typing as t
+from itertools import product
+
+from pydeck.button import Button
+from pydeck.snapshot import SnapshotLog, serialize_buttons
+from pydeck.stream import Broadcaster, sse_message
+from pydeck.typing import ButtonId
+from pydeck.variables import PLUGIN_SEP
+
+if t.TYPE_CHECKING:
+    from collections.abc import Iterable, Mapping
+
+    from pydeck.snapshot import Snapshot
+
+DEFAULT_PAGE = "main"
+
+ButtonMatrix: t.TypeAlias = dict[ButtonId, Button]
+
+
+class Page:
+    """Named set of buttons on a `rows x cols` grid
+
+    Storage is sparse: only configured buttons are kept and rendered,
+    blank cells are implied by the grid size. A page is rendered only
+    while someone views it, changes accumulate until then.
+    """
+
+    name: str
+    rows: int
+    cols: int
+    buttons: ButtonMatrix
+    dependents: dict[str, set[ButtonId]]
+    required_plugins: set[str]
+    snapshots: SnapshotLog
+    broadcaster: Broadcaster
+    fresh: threading.Event
+    viewed_until: float
+    _dirty: set[ButtonId]
+    _removed: set[ButtonId]
+    _blank: Button
+    _frame: tuple[int, bytes]
+
+    def __init__(
+        self,
+        name: str,
+        rows: int,
+        cols: int,
+        version: int,
+        history: int,
+        stream_buffer: int = 32,
+    ) -> None:
+        self.name = name
+        self.rows = rows
+        self.cols = cols
+        self.buttons = {}
+        self.dependents = {}
+        self.required_plugins = set()
+        self.snapshots = SnapshotLog(version, history)
+        self.broadcaster = Broadcaster(stream_buffer)
+        self.fresh = threading.Event()
+        self.viewed_until = 0
+        self._dirty = set()
+        self._removed = set()
+        self._blank = Button("&nbsp;")
+        self._frame = (-1, b"")
+
+    @property
+    def viewed(self) -> bool:
+        """Whether a stream client is connected or page was fetched recently"""
+        return bool(self.broadcaster) or time.monotonic() < self.viewed_until
+
+    @property
+    def stale(self) -> bool:
+        """Whether page has changes which are not rendered yet"""
+        return bool(self._dirty or self._removed)
+
+    def view(self, duration: float) -> bool:
+        """Keep page rendered for at least `duration` seconds
+
+        Returns whether the page wasn't viewed and has to be rendered
+        """
+        was_viewed = self.viewed
+        self.viewed_until = max(self.viewed_until, time.monotonic() + duration)
+
+        if was_viewed or not self.stale:
+            return False
+
+        self.fresh.clear()
+        return True
+
+    def set_buttons(self, buttons: ButtonMatrix) -> None:
+        """Replace buttons, mark added, modified and removed ones"""
+        # Variable name -> ids of buttons using it
+        dependents: dict[str, set[ButtonId]] = {}
+        for _id, button in buttons.items():
+            for name in button.variables:
+                dependents.setdefault(name, set()).add(_id)
+
+        # Plugins whose variables or actions are used
+        self.required_plugins = {
+            name.split(PLUGIN_SEP, 1)[0]
+            for button in buttons.values()
+            for name in (*button.variables, button.action or "")
+            if PLUGIN_SEP in name
+        }
+
+        previous = self.buttons
+        self.buttons = buttons
+        self.dependents = dependents
+        self._dirty |= {
+            _id for _id, button in buttons.items() if previous.get(_id) != button
+        }
+        self._dirty &= buttons.keys()
+        self._removed |= previous.keys() - buttons.keys()
+        self._removed -= buttons.keys()
+
+    def invalidate(self, names: Iterable[str]) -> None:
+        """Mark buttons using changed variables"""
+        for name in names:
+            self._dirty.update(self.dependents.get(name, ()))
+
+    def take_changes(self) -> tuple[set[ButtonId], set[ButtonId]]:
+        """Get and reset ids of buttons to render and removed ones"""
+        dirty, self._dirty = self._dirty, set()
+        removed, self._removed = self._removed, set()
+        return dirty, removed
+
+    def grid(self) -> tuple[Snapshot, bytes]:
+        """Current snapshot with every cell of the grid, blank ones included
+
+        Serialized on demand, once per version
+        """
+        return self.snapshots.serialized("grid", self._serialize_grid)
+
+    def _serialize_grid(self, buttons: Mapping[ButtonId, Button]) -> bytes:
+        return serialize_buttons(
+            (_id, buttons.get(_id, self._blank))
+            for _id in product(range(self.rows), range(self.cols))
+        )
+
+    def full_frame(self) -> tuple[int, bytes]:
+        """Version and stream message with the current snapshot
+
+        Encoded once per version, shared by every (re)connecting client
+        """
+        snapshot = self.snapshots.current
+
+        if self._frame[0] != snapshot.version:
+            self._frame = (snapshot.version, sse_message(self.snapshots.delta(-1)))
+
+        return self._frame
@@ -2,25 +2,59 @@
 
 from __future__ import annotations
 
+import concurrent.futures
+import functools
 import importlib.util
+import inspect
+import json
 import logging
+import math
 import os
 import pathlib
 import sys
+import threading
+import time
 import typing as t
+from concurrent.futures import Future, ThreadPoolExecutor
 
+from .aio import EventLoopThread
+from .cache import CachedVariable, cached_variables
+from .metrics import NULL_REGISTRY
+from .scheduler import Scheduler
 from .utils import get_path
+from .variables import PLUGIN_SEP, VariableStore
 
 if t.TYPE_CHECKING:
     from pydeck_shared import DeckPlugin
 
+    from .metrics import Counter, Histogram, Registry
+
 libs_path = get_path(__file__) + "/plugin_libs"
 sys.path.append(libs_path)
 
 
 logger = logging.getLogger(__name__)
 
-PLUGIN_SEP = "__"  # Separator for plugin's variables and methods
+MANIFEST_FILE = "_manifest.json"  # Starts with "_", so it's not loaded as a plugin
+MANIFEST_VERSION = 1
+
+
+class ManifestEntry(t.TypedDict):
+    mtime: float
+    plugin_id: str
+
+
+def _source_mtime(path: str) -> float:
+    """Last modification time of plugin file or any file of plugin package"""
+    root = pathlib.Path(path)
+
+    if not root.is_dir():
+        return root.stat().st_mtime
+
+    return max(
+        (file.stat().st_mtime for file in root.rglob("*.py")),
+        default=root.stat().st_mtime,
+    )
 
 
 def _load_module(plugin_name: str, plugins_path: str) -> type[DeckPlugin] | None:
@@ -33,8 +67,12 @@ def _load_module(plugin_name: str, plugins_path: str) -> type[DeckPlugin] | None
         module_name, ext = plugin_name.rsplit(".", 1)
 
         if ext in ("zip", "pyz"):
-            sys.path.append(module_path)
+            if module_path not in sys.path:
+                sys.path.append(module_path)
 
+            # Import again on reload
+            sys.modules.pop(module_name, None)
+            sys.path_importer_cache.pop(module_path, None)
             _module = __import__(f"{module_name}")
 
             return _module.Main
@@ -64,82 +102,504 @@ def _load_module(plugin_name: str, plugins_path: str) -> type[DeckPlugin] | None
 class PluginManager:
     """Plugin manager
 
-    Loads plugins
+    Loads plugins, runs their updates in a thread pool.
+
+    Plugins may define `update_interval` (seconds) attribute,
+    otherwise `update_interval` of the manager is used.
+
+    `load`, `update` and actions may be coroutine functions, those run on
+    a shared event loop.
+
+    Methods decorated with `pydeck.cache.cached` compute variables on
+    their own schedule, see `pydeck.cache`.
+
+    Plugins are imported and loaded in parallel. Ids of loaded plugins are
+    cached in a manifest inside `plugin_dir`, with `lazy` on, plugins are
+    imported only once required.
     """
 
     plugins: dict[str, DeckPlugin]
     plugin_dir: str
-
-    def __init__(self, plugin_dir: str) -> None:
+    manifest_path: str
+    lazy: bool
+    config: dict[str, dict[str, t.Any]]
+    update_interval: float
+    on_change: t.Callable[[], None] | None
+    scheduler: Scheduler
+    loop: EventLoopThread
+    store: VariableStore
+    _cached: dict[str, dict[str, CachedVariable]]
+    _pending: dict[str, str]
+    _loading: set[str]
+    _loaded: dict[str, tuple[float, str]]
+    _failed: dict[str, float]
+    _lock: threading.Lock
+    _loader: ThreadPoolExecutor
+    _manifest: dict[str, ManifestEntry]
+    _manifest_lock: threading.Lock
+    _update_seconds: Histogram
+    _update_errors: Counter
+
+    def __init__(
+        self,
+        plugin_dir: str,
+        *,
+        workers: int = 4,
+        update_interval: float = 0.1,
+        update_timeout: float = 1.0,
+        lazy: bool = False,
+        on_change: t.Callable[[], None] | None = None,
+    ) -> None:
+        """Create plugin manager
+
+        Args:
+            plugin_dir: directory to load plugins from
+            workers: number of threads running plugins' updates
+            update_interval: default interval of plugin updates
+            update_timeout: time after which running update is an overrun
+            lazy: load only plugins required by `load` or `require`
+            on_change: called (from worker thread) when plugin variables change
+        """
         self.plugin_dir = plugin_dir
+        self.manifest_path = f"{plugin_dir}/{MANIFEST_FILE}"
+        self.lazy = lazy
+        self.config = {}
         self.plugins = {}
+        self.update_interval = update_interval
+        self.on_change = on_change
+        self.loop = EventLoopThread()
+        self.scheduler = Scheduler(workers, update_timeout, self.loop)
+        self.store = VariableStore()
+        self._cached = {}
+        self._pending = {}
+        self._loading = set()
+        self._loaded = {}
+        self._failed = {}
+        # Guards the above, loader threads update them
+        self._lock = threading.Lock()
+        self._loader = ThreadPoolExecutor(workers, thread_name_prefix="plugin-loader")
+        self._manifest = {}
+        self._manifest_lock = threading.Lock()
+        self.instrument(NULL_REGISTRY)
+
+    def instrument(self, metrics: Registry) -> None:
+        """Collect plugin update metrics into registry"""
+        self._update_seconds = metrics.histogram(
+            "plugin_update_seconds",
+            "Duration of plugin updates",
+            ["plugin"],
+        )
+        self._update_errors = metrics.counter(
+            "plugin_update_errors_total",
+            "Plugin updates which raised an exception",
+            ["plugin"],
+        )
+        metrics.callback(
+            "counter",
+            "plugin_update_overruns_total",
+            "Plugin updates which ran longer than the timeout",
+            lambda: {
+                (name,): job.overruns for name, job in list(self.scheduler.jobs.items())
+            },
+            ["plugin"],
+        )
+
+    def load(
+        self,
+        *,
+        wait: bool = True,
+        required: t.Iterable[str] | None = None,
+    ) -> None:
+        """Load plugins in parallel & execute them
+
+        Plugin ids are looked up in the manifest, so with `lazy` on,
+        unreferenced plugins are not even imported. Plugins missing from
+        the manifest or changed since are always loaded.
+
+        Args:
+            wait: block until all plugins are loaded
+            required: ids of plugins to load with `lazy` on,
+                the rest is loaded on `require`
+        """
+        manifest = self._read_manifest()
+        required = set(required or ())
+        futures: list[Future[None]] = []
+
+        for filename, mtime in self.sources().items():
+            entry = manifest.get(filename)
+
+            if (
+                self.lazy
+                and entry
+                and entry["mtime"] == mtime
+                and entry["plugin_id"] not in required
+            ):
+                logger.debug("Deferring plugin: %s", filename)
+                with self._lock:
+                    self._pending[entry["plugin_id"]] = filename
+                continue
 
-    def load(self) -> None:
-        """Load plugins & execute them"""
-        packages = os.listdir(self.plugin_dir)
+            futures.append(self._submit(filename, mtime))
 
-        for plugin in packages:
-            if plugin.startswith("_"):
-                continue
+        if wait:
+            concurrent.futures.wait(futures)
+            logger.debug("Loaded plugins: %s", list(self.plugins.keys()))
 
-            logger.debug("Loading plugin: %s", plugin)
-            # plugin_module = __import__(f"pydeck.plugins.{plugin}")
-            plugin_main: type[DeckPlugin] | None = _load_module(plugin, self.plugin_dir)
+    def require(self, plugin_ids: t.Iterable[str]) -> None:
+        """Start loading deferred plugins, doesn't wait for them"""
+        for plugin_id in plugin_ids:
+            with self._lock:
+                filename = self._pending.pop(plugin_id, None)
+            if filename:
+                self._submit(filename, _source_mtime(f"{self.plugin_dir}/{filename}"))
 
-            if plugin_main is None:
+    def sources(self) -> dict[str, float]:
+        """Plugin files in `plugin_dir` with their modification times"""
+        sources: dict[str, float] = {}
+
+        for filename in os.listdir(self.plugin_dir):
+            if filename.startswith("_"):
                 continue
 
-            obj: DeckPlugin = plugin_main()
-            obj.load()
+            try:
+                sources[filename] = _source_mtime(f"{self.plugin_dir}/{filename}")
+            except OSError:
+                # Deleted while listing
+                continue
+
+        return sources
+
+    def reload(self) -> None:
+        """Apply changes of `plugin_dir`
+
+        Removes plugins whose files were deleted, reloads modified
+        and loads new ones. Unchanged plugins keep running, plugins
+        which failed to load are retried once their files change.
+        """
+        sources = self.sources()
+
+        with self._lock:
+            changed = [
+                (filename, plugin_id)
+                for filename, (mtime, plugin_id) in self._loaded.items()
+                if sources.get(filename) != mtime
+            ]
+            for filename, _ in changed:
+                del self._loaded[filename]
+
+            for filename, mtime in list(self._failed.items()):
+                if sources.get(filename) != mtime:
+                    del self._failed[filename]
+
+            for plugin_id, filename in list(self._pending.items()):
+                if filename not in sources:
+                    del self._pending[plugin_id]
+
+            known = (
+                self._loaded.keys()
+                | self._loading
+                | self._failed.keys()
+                | set(self._pending.values())
+            )
+
+        for _, plugin_id in changed:
+            logger.info("Unloading plugin: %s", plugin_id)
+            self.remove(plugin_id)
+
+        for filename in sources.keys() - known:
+            logger.info("Loading plugin: %s", filename)
+            self._submit(filename, sources[filename])
+
+    def remove(self, plugin_id: str) -> None:
+        """Stop plugin's updates, delete it with its variables"""
+        self.scheduler.remove(plugin_id)
+        for name in self._cached.pop(plugin_id, {}):
+            self.scheduler.remove(f"{plugin_id}{PLUGIN_SEP}{name}")
+
+        if (plugin := self.plugins.pop(plugin_id, None)) is None:
+            return
+
+        self._unload(plugin_id, plugin)
+
+        if self.store.remove_plugin(plugin_id) and self.on_change:
+            self.on_change()
+
+    def _submit(self, filename: str, mtime: float) -> Future[None]:
+        with self._lock:
+            self._loading.add(filename)
+        future = self._loader.submit(self._load_plugin, filename, mtime)
+        future.add_done_callback(lambda _: self._done_loading(filename))
+        return future
 
-            if hasattr(obj, "plugin_id"):
-                self.plugins[obj.plugin_id] = obj
-            else:
-                self.plugins[plugin.replace(".py", "")] = obj
+    def _done_loading(self, filename: str) -> None:
+        with self._lock:
+            self._loading.discard(filename)
 
-            logger.debug("Loaded plugin: %s", plugin)
+    def _load_plugin(self, filename: str, mtime: float) -> None:
+        logger.debug("Loading plugin: %s", filename)
 
-        logger.debug("Loaded plugins: %s", list(self.plugins.keys()))
+        try:
+            plugin_main = _load_module(filename, self.plugin_dir)
+
+            if plugin_main is None:
+                self._load_failed(filename, mtime)
+                return
+
+            obj: DeckPlugin = plugin_main()
+            if inspect.isawaitable(result := obj.load()):
+                self.loop.run(result)
+        except Exception:
+            # Broken plugin must not prevent others from loading
+            logger.exception("Failed to load plugin '%s'", filename)
+            self._load_failed(filename, mtime)
+            return
+
+        if hasattr(obj, "plugin_id"):
+            plugin_id = obj.plugin_id
+        else:
+            plugin_id = filename.replace(".py", "")
+
+        self.add(plugin_id, obj)
+        with self._lock:
+            self._loaded[filename] = (mtime, plugin_id)
+        self._update_manifest(filename, {"mtime": mtime, "plugin_id": plugin_id})
+
+        logger.debug("Loaded plugin: %s", filename)
+
+    def _load_failed(self, filename: str, mtime: float) -> None:
+        """Remember failed file version, it's not loaded again until it changes"""
+        with self._lock:
+            self._failed[filename] = mtime
+
+    def _read_manifest(self) -> dict[str, ManifestEntry]:
+        try:
+            with pathlib.Path(self.manifest_path).open() as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+        if manifest.get("version") != MANIFEST_VERSION:
+            return {}
+
+        self._manifest = manifest["plugins"]
+        return dict(self._manifest)
+
+    def _update_manifest(self, filename: str, entry: ManifestEntry) -> None:
+        with self._manifest_lock:
+            if self._manifest.get(filename) == entry:
+                return
+
+            self._manifest[filename] = entry
+            data = {"version": MANIFEST_VERSION, "plugins": self._manifest}
+
+            try:
+                with pathlib.Path(self.manifest_path).open("w") as f:
+                    json.dump(data, f, indent=2)
+            except OSError as e:
+                logger.debug("Failed to write plugin manifest: %r", e)
+
+    def add(self, plugin_id: str, plugin: DeckPlugin) -> None:
+        """Register loaded plugin, schedule its updates"""
+        if settings := self.config.get(plugin_id):
+            plugin.config.update(settings)
+
+        self.plugins[plugin_id] = plugin
+        self._cached[plugin_id] = cached = cached_variables(plugin)
+        self._sync_variables(plugin_id, plugin)
+
+        update = (
+            self._update_plugin_async
+            if inspect.iscoroutinefunction(plugin.update)
+            else self._update_plugin
+        )
+        self.scheduler.add(
+            plugin_id,
+            functools.partial(update, plugin_id, plugin),
+            getattr(plugin, "update_interval", self.update_interval),
+        )
+
+        for name, variable in cached.items():
+            refresh = (
+                self._refresh_cached_async
+                if variable.is_async
+                else self._refresh_cached
+            )
+            self.scheduler.add(
+                f"{plugin_id}{PLUGIN_SEP}{name}",
+                functools.partial(refresh, plugin_id, plugin, variable),
+                variable.policy.interval,
+                variable.policy.expires,
+            )
 
     def set_config(self, config: dict[str, dict[str, t.Any]]) -> None:
         """Set plugins' config
 
         config: dict { plugin_name: { setting: value } }
+
+        Plugins loaded later get their settings when added
         """
+        self.config = config
+
         for plugin_name, settings in config.items():
             plugin = self.plugins.get(plugin_name)
 
             if plugin:
                 plugin.config.update(settings)
 
-    def update(self) -> None:
-        """Update plugins"""
-        for plugin in self.plugins.values():
-            try:
+    def update(self) -> float:
+        """Schedule due plugin updates, doesn't wait for them
+
+        Returns time (`time.monotonic`) when next update is due
+        """
+        return min(self.scheduler.tick(), self._drop_stale())
+
+    def refresh(self, plugin_id: str) -> None:
+        """Update plugin now, in the calling thread"""
+        plugin = self.plugins[plugin_id]
+
+        if inspect.iscoroutinefunction(plugin.update):
+            self.loop.run(self._update_plugin_async(plugin_id, plugin))
+        else:
+            self._update_plugin(plugin_id, plugin)
+
+    def stop(self) -> None:
+        """Stop running plugin updates"""
+        self._loader.shutdown(wait=False, cancel_futures=True)
+        self.scheduler.shutdown()
+        for plugin_id, plugin in list(self.plugins.items()):
+            self._unload(plugin_id, plugin)
+        self.loop.stop()
+
+    def _unload(self, plugin_id: str, plugin: DeckPlugin) -> None:
+        """Call plugin's optional `unload`, to release its resources"""
+        if (unload := getattr(plugin, "unload", None)) is None:
+            return
+
+        try:
+            if inspect.isawaitable(result := unload()):
+                self.loop.run(result)
+        except Exception:
+            logger.exception("Failed to unload plugin '%s'", plugin_id)
+
+    def _update_plugin(self, plugin_id: str, plugin: DeckPlugin) -> None:
+        try:
+            with self._update_seconds.time(plugin_id):
                 plugin.update()
-            except Exception:  # noqa: PERF203
-                logger.exception("Plugin '%s' error", plugin.name)
+        except Exception:
+            self._update_errors.inc(plugin_id)
+            raise
+        finally:
+            self._sync_variables(plugin_id, plugin)
+
+    async def _update_plugin_async(self, plugin_id: str, plugin: DeckPlugin) -> None:
+        try:
+            with self._update_seconds.time(plugin_id):
+                await plugin.update()  # type: ignore[reportGeneralTypeIssues]
+        except Exception:
+            self._update_errors.inc(plugin_id)
+            raise
+        finally:
+            self._sync_variables(plugin_id, plugin)
+
+    def _refresh_cached(
+        self,
+        plugin_id: str,
+        plugin: DeckPlugin,
+        variable: CachedVariable,
+    ) -> None:
+        # Previous value stays published until this returns
+        variable.set(variable.func())
+        self._sync_variables(plugin_id, plugin)
+
+    async def _refresh_cached_async(
+        self,
+        plugin_id: str,
+        plugin: DeckPlugin,
+        variable: CachedVariable,
+    ) -> None:
+        variable.set(await variable.func())
+        self._sync_variables(plugin_id, plugin)
+
+    def _drop_stale(self) -> float:
+        """Remove cached values which weren't refreshed in time
+
+        Returns time (`time.monotonic`) when next value may become too stale
+        """
+        now = time.monotonic()
+        next_drop = math.inf
 
-    @property
-    def variables(self) -> dict[str, t.Any]:
-        """Get variables from plugins"""
-        variables: dict[str, t.Any] = {}
+        for plugin_id, cached in list(self._cached.items()):
+            dropped = False
 
-        for plugin_id, plugin in self.plugins.items():
-            variables.update(
-                {f"{plugin_id}{PLUGIN_SEP}{k}": v for k, v in plugin.variables.items()},
-            )
+            for variable in cached.values():
+                if not variable.has_value:
+                    continue
+                if variable.drop_at <= now:
+                    variable.drop()
+                    dropped = True
+                else:
+                    next_drop = min(next_drop, variable.drop_at)
+
+            if dropped and (plugin := self.plugins.get(plugin_id)):
+                self._sync_variables(plugin_id, plugin)
+
+        return next_drop
+
+    def _sync_variables(self, plugin_id: str, plugin: DeckPlugin) -> None:
+        """Write plugin's variables into the store, notify if they changed"""
+        if self.plugins.get(plugin_id) is not plugin:
+            # Removed while updating
+            return
 
-        return variables
+        variables = dict(plugin.variables)
+        for name, variable in self._cached.get(plugin_id, {}).items():
+            if variable.has_value:
+                variables[name] = variable.value
+
+        changed = self.store.update(plugin_id, variables, replace=True)
+
+        if changed and self.on_change:
+            self.on_change()
+
+    @property
+    def variables(self) -> dict[str, t.Any]:
+        """Get variables from plugins (`plugin__name` -> value)"""
+        return dict(self.store.flat)
 
     @property
     def actions(self) -> dict[str, t.Any]:
         """Get actions from plugins"""
         actions: dict[str, t.Any] = {}
 
-        for plugin_id, plugin in self.plugins.items():
+        for plugin_id, plugin in list(self.plugins.items()):
             actions.update(
-                {f"{plugin_id}{PLUGIN_SEP}{k}": v for k, v in plugin.actions.items()},
+                {
+                    f"{plugin_id}{PLUGIN_SEP}{k}": self._wrap_action(v)
+                    for k, v in plugin.actions.items()
+                },
             )
 
         return actions
+
+    def action(self, name: str) -> t.Callable[..., t.Any] | None:
+        """Get action by name (`plugin__action`), None if it's not loaded"""
+        plugin_id, _, action_name = name.partition(PLUGIN_SEP)
+
+        if not (plugin := self.plugins.get(plugin_id)):
+            return None
+
+        if not (action := plugin.actions.get(action_name)):
+            return None
+
+        return self._wrap_action(action)
+
+    def _wrap_action(self, action: t.Callable[..., t.Any]) -> t.Callable[..., t.Any]:
+        """Make coroutine function action callable from any thread"""
+        if not inspect.iscoroutinefunction(action):
+            return action
+
+        @functools.wraps(action)
+        def run(*args: t.Any, **kwargs: t.Any) -> t.Any:  # noqa: ANN401
+            return self.loop.run(action(*args, **kwargs))
+
+        return run
@@ -1,21 +1,26 @@
 import datetime
+import math
 import typing as t
 
 from pydeck_shared.plugin import DeckPlugin
 
+from pydeck.cache import cached
+
 
 class Main(DeckPlugin):
     name = "Builtin"
     description = "Builtin plugin"
     author = "Virashu"
 
+    # Variables are cached, refreshed on their own schedule
+    update_interval = math.inf
+
     @t.final
-    def load(self) -> None:
-        self.variables = {"time": self._get_time()}
+    def load(self) -> None: ...
 
     @t.final
-    def update(self) -> None:
-        self.variables = {"time": self._get_time()}
+    def update(self) -> None: ...
 
-    def _get_time(self) -> str:
+    @cached(align=1)
+    def _time(self) -> str:
         return datetime.datetime.now().strftime("%H:%M:%S")  # noqa: DTZ005
@@ -1,44 +1,93 @@
 from __future__ import annotations
 
-import json
+import hashlib
 import logging
-import time
 import typing as t
-from urllib.error import URLError
-from urllib.request import Request, urlopen
 
+import requests
 from pydeck_shared.plugin import DeckPlugin
+from requests.adapters import HTTPAdapter
 
 logger = logging.getLogger(__name__)
 
 
-def _check_connection(url: str) -> bool:
-    try:
-        with urlopen(url, timeout=0.1):  # noqa: S310
-            pass
-    except URLError:
-        return False
-    return True
-
-
-def _get_data(url: str) -> dict[str, t.Any] | None:
-    try:
-        with urlopen(url, timeout=0.1) as response:  # noqa: S310
-            contents = response.read()
-        data = json.loads(contents)
-    except (URLError, json.JSONDecodeError):
-        return None
-    return data
-
-
-def _post(url: str) -> None:
-    req = Request(  # noqa: S310
-        url,
-        method="GET",
-        headers={"Allow-Origin": "*", "Cross-Origin-Resource-Policy": "cross-origin"},
-    )
-    with urlopen(req, timeout=1) as response:  # noqa: S310
-        response.read()
+class MediaClient:
+    """Keep-alive HTTP client of the media server
+
+    Connections are pooled and reused by polls and control calls.
+    Unchanged data (by ETag or content hash) is reported as `None`.
+    """
+
+    timeout: float
+    control_timeout: float
+    _session: requests.Session
+    _etags: dict[str, str]
+    _digests: dict[str, bytes]
+
+    def __init__(self, timeout: float = 0.1, control_timeout: float = 1) -> None:
+        self.timeout = timeout
+        self.control_timeout = control_timeout
+        self._etags = {}
+        self._digests = {}
+
+        self._session = requests.Session()
+        # Poll and concurrent control calls
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=4)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+
+    def check_connection(self, url: str) -> bool:
+        try:
+            response = self._session.get(url, timeout=self.timeout)
+        except requests.RequestException:
+            return False
+        return response.ok
+
+    def get_data(self, url: str) -> dict[str, t.Any] | None:
+        """Get JSON data
+
+        Returns `None` if data is unchanged since last call or on error
+        """
+        headers = {}
+        if etag := self._etags.get(url):
+            headers["If-None-Match"] = etag
+
+        try:
+            response = self._session.get(url, headers=headers, timeout=self.timeout)
+            if response.status_code == requests.codes.not_modified:
+                return None
+            response.raise_for_status()
+        except requests.RequestException:
+            return None
+
+        if etag := response.headers.get("ETag"):
+            self._etags[url] = etag
+
+        digest = hashlib.blake2b(response.content, digest_size=16).digest()
+        if self._digests.get(url) == digest:
+            return None
+
+        try:
+            data = response.json()
+        except ValueError:
+            return None
+
+        self._digests[url] = digest
+        return data
+
+    def post(self, url: str) -> None:
+        response = self._session.get(
+            url,
+            headers={
+                "Allow-Origin": "*",
+                "Cross-Origin-Resource-Policy": "cross-origin",
+            },
+            timeout=self.control_timeout,
+        )
+        response.raise_for_status()
+
+    def close(self) -> None:
+        self._session.close()
 
 
 class Main(DeckPlugin):
@@ -47,6 +96,7 @@ class Main(DeckPlugin):
     author = "Virashu"
 
     plugin_id = "media_control"
+    update_interval = 0.5
 
     @t.final
     def load(self) -> None:
@@ -66,20 +116,17 @@ class Main(DeckPlugin):
             "prev": self._prev,
         }
 
-        if not _check_connection(self.config["url"]):
+        self._client = MediaClient()
+
+        if not self._client.check_connection(self.config["url"]):
             logger.warning("Media control server not running")
 
-        self._last = time.time()
-        self._min_delta = 0.5
+    def unload(self) -> None:
+        self._client.close()
 
     @t.final
     def update(self) -> None:
-        if time.time() - self._last < self._min_delta:
-            return
-
-        self._last = time.time()
-
-        data = _get_data(self.config["url"] + "/data")
+        data = self._client.get_data(self.config["url"] + "/data")
 
         if not data:
             return
@@ -89,11 +136,11 @@ class Main(DeckPlugin):
             "artist": data["artist"],
             "album_title": data["album_title"],
             "album_artist": data["album_artist"],
-            "staete": data["state"],
+            "state": data["state"],
         }
 
     def _control(self, action: str) -> None:
-        _post(self.config["url"] + "/control/" + action)
+        self._client.post(self.config["url"] + "/control/" + action)
 
     def _toggle_pause(self) -> None:
         self._control("pause")
@@ -5,14 +5,22 @@ Run applications
 Control volume
 """
 
+import asyncio
+import codecs
 import logging
-import subprocess
+import time
 import typing as t
 
 from pydeck_shared.plugin import DeckPlugin
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_TIMEOUT = 10.0  # Seconds a captured command may run
+DEFAULT_MAX_PROCESSES = 4  # Captured commands running at once
+MAX_OUTPUT = 65536  # Characters of captured output kept in the variable
+
+CacheKey: t.TypeAlias = tuple[str, ...]
+
 
 class Main(DeckPlugin):
     name = "System (win)"
@@ -21,32 +29,123 @@ class Main(DeckPlugin):
 
     plugin_id = "system"
 
+    # Captured output is written into variables as it arrives,
+    # updates publish it
+    update_interval = 0.1
+
+    _processes: asyncio.Semaphore
+    _cache: dict[CacheKey, tuple[float, str]]
+    _running: dict[tuple[CacheKey, str], asyncio.Task[None]]
+
     @t.final
     def load(self) -> None:
         self.actions = {
             "launch": self._launch_app,
         }
+        self._processes = asyncio.Semaphore(
+            self.config.get("max_processes", DEFAULT_MAX_PROCESSES),
+        )
+        self._cache = {}
+        self._running = {}
 
     @t.final
     def update(self) -> None: ...
 
-    def _launch_app(
-        self, path: str, *, capture: bool = False, var_name: str = ""
+    async def _launch_app(
+        self,
+        path: str,
+        *,
+        capture: bool = False,
+        var_name: str = "",
+        timeout: float | None = None,  # noqa: ASYNC109
+        cache_ttl: float = 0,
     ) -> None:
         """Launch executable.
 
+        Returns once it's started, captured output keeps streaming into
+        the variable, so the action doesn't hold an executor slot.
+
         Args:
             path: path of executable
             capture: whether to capture output
             var_name: name of variable to save output
+            timeout: seconds before a captured command is killed,
+                `timeout` of plugin config by default
+            cache_ttl: seconds to reuse output of a captured command
+                which exited successfully, for idempotent commands
         """
-        if capture:
-            if not var_name:
-                logger.warning("You should specify a variable name to use capture")
+        args = tuple(path.split())
+
+        if not capture:
+            process = await asyncio.create_subprocess_exec(*args)
+            # Reap it when it exits, without waiting here
+            _ = asyncio.ensure_future(process.wait())  # noqa: RUF006
+            return
+
+        if not var_name:
+            logger.warning("You should specify a variable name to use capture")
+            return
+
+        cached = self._cache.get(args)
+        if cached is not None and time.monotonic() - cached[0] < cache_ttl:
+            self.variables[var_name] = cached[1]
+            return
+
+        # Presses while the same command runs into the same variable
+        # share its output
+        key = (args, var_name)
+        if key in self._running:
+            return
+
+        task = asyncio.ensure_future(self._capture(args, var_name, timeout, cache_ttl))
+        self._running[key] = task
+        task.add_done_callback(lambda _: self._finished(key, task))
+
+    def _finished(self, key: tuple[CacheKey, str], task: asyncio.Task[None]) -> None:
+        self._running.pop(key, None)
+
+        if not task.cancelled() and (e := task.exception()) is not None:
+            logger.error("Command failed: %s: %r", key[0][0], e)
+
+    async def _capture(
+        self,
+        args: CacheKey,
+        var_name: str,
+        timeout: float | None,  # noqa: ASYNC109
+        cache_ttl: float,
+    ) -> None:
+        """Run command, streaming its output into the variable
+
+        Output of a successful run is cached for `cache_ttl` seconds
+        """
+        if timeout is None:
+            timeout = self.config.get("timeout", DEFAULT_TIMEOUT)
+
+        async with self._processes:
+            process = await asyncio.create_subprocess_exec(
+                *args,
+                stdout=asyncio.subprocess.PIPE,
+            )
+            stdout = t.cast("asyncio.StreamReader", process.stdout)
+            decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+            output = ""
+
+            try:
+                async with asyncio.timeout(timeout):
+                    while chunk := await stdout.read(4096):
+                        output = (output + decoder.decode(chunk))[-MAX_OUTPUT:]
+                        self.variables[var_name] = output
+                    await process.wait()
+            except TimeoutError:
+                logger.warning("Command timed out after %ss: %s", timeout, args[0])
+                process.kill()
+                await process.wait()
                 return
-            res = subprocess.check_output(path.split()).decode("utf-8")  # noqa: S603
-            self.variables[var_name] = res
 
-        else:
-            p = subprocess.Popen(path.split())  # noqa: S603
-            del p
+        output = (output + decoder.decode(b"", final=True))[-MAX_OUTPUT:]
+        self.variables[var_name] = output
+
+        if process.returncode:
+            logger.warning("Command exited with %s: %s", process.returncode, args[0])
+        elif cache_ttl > 0:
+            self._cache[args] = (time.monotonic(), output)
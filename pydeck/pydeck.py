@@ -4,21 +4,40 @@ from __future__ import annotations
 
 __all__ = ["Deck"]
 
-import copy
+import functools
 import logging
+import queue
 import re
 import threading
 import time
 import typing as t
-from itertools import product
 
 import flask
 
+from pydeck import wire
+from pydeck.actions import ActionExecutor, ClickEvent, Debouncer
+from pydeck.assets import AssetBundle, client_config_js
 from pydeck.button import Button as DeckButton
-from pydeck.config import config
-from pydeck.pluginmanager import PLUGIN_SEP, PluginManager
-from pydeck.typing import ActionCallable, ButtonId
+from pydeck.codec import (
+    COMPRESSIONS,
+    CompressionCache,
+    JSONProvider,
+    compress,
+    dumps,
+)
+from pydeck.config import CONFIG_FILE, load_config
+from pydeck.config import config as user_config
+from pydeck.icons import IconStore
+from pydeck.metrics import Registry
+from pydeck.page import DEFAULT_PAGE, ButtonMatrix, Page
+from pydeck.pluginmanager import PluginManager
+from pydeck.stream import CLOSED, RESYNC, sse_message
 from pydeck.utils import empty
+from pydeck.variables import variable_name
+from pydeck.watcher import Watcher, file_mtime
+
+if t.TYPE_CHECKING:
+    from pydeck.typing import ButtonId
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -29,7 +48,13 @@ flask.cli.show_server_banner = empty
 PATH: str = __file__.replace("\\", "/").rsplit("/", 1)[0]
 ROOT: str = PATH.rsplit("/", 1)[0]
 
-ButtonMatrix: t.TypeAlias = dict[ButtonId, DeckButton]
+STREAM_KEEPALIVE: float = 15  # Seconds between SSE keep-alive comments
+PAGE_VIEW_TIMEOUT: float = 10  # Seconds a page is rendered after a request
+PAGE_RENDER_TIMEOUT: float = 1  # Max wait for render of a page viewed again
+# Representations of buttons, preferred first
+API_MIMETYPES: list[str] = ["application/json", wire.MIMETYPE]
+EVENT_BATCH_LIMIT: int = 64  # Max events in one `/api/event` request
+EVENT_WAIT_LIMIT: float = 10  # Max seconds `/api/event` waits for actions
 
 
 def buttons_as_list(obj: ButtonMatrix) -> list[dict[str, t.Any]]:
@@ -40,65 +65,299 @@ def buttons_as_list(obj: ButtonMatrix) -> list[dict[str, t.Any]]:
     return [{"id": k} | v.as_dict() for k, v in obj.items()]
 
 
+def buttons_from_config(
+    config: dict[str, dict[str, t.Any]],
+    icons: IconStore | None = None,
+) -> ButtonMatrix:
+    """Create buttons from `deck.buttons` config section
+
+    config: dict { "row:col": { button argument: value } }
+    icons: store resolving icon file names to URLs
+    """
+    buttons: ButtonMatrix = {}
+
+    for str_id, kwargs in config.items():
+        if not re.search(r"^\d+:\d+$", str_id):
+            logger.warning("Invalid button id in config: %s", str_id)
+            continue
+
+        try:
+            button = DeckButton(**kwargs)
+        except (TypeError, ValueError) as e:
+            logger.warning("Invalid button %s in config: %r", str_id, e)
+            continue
+
+        if button.icon:
+            button.icon = icons.url(button.icon) if icons else None
+
+        buttons[tuple(map(int, str_id.split(":")))] = button  # type: ignore[reportArgumentType]
+
+    return buttons
+
+
+def pages_from_config(
+    config: dict[str, t.Any],
+    icons: IconStore | None = None,
+) -> dict[str, ButtonMatrix]:
+    """Create pages from `deck` config section
+
+    `deck.buttons` is the default page, `deck.pages` adds named ones:
+    dict { page: { "row:col": { button argument: value } } }
+    """
+    pages = {
+        DEFAULT_PAGE: buttons_from_config(config["buttons"], icons)
+        or default_buttons(),
+    }
+
+    for name, buttons in config["pages"].items():
+        pages[name] = buttons_from_config(buttons, icons)
+
+    return pages
+
+
+def _client_time(event: dict[str, t.Any]) -> float | None:
+    """Client timestamp (ms) of an event, if it has a valid one"""
+    value = event.get("time")
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    return value
+
+
+def default_buttons() -> ButtonMatrix:
+    """Layout used when config has no buttons"""
+    return {
+        (0, 2): DeckButton("{media_control__title}\n{media_control__artist}"),
+        (1, 1): DeckButton("Previous", action="media_control__prev"),
+        (1, 2): DeckButton("Play/Pause", action="media_control__toggle_pause"),
+        (1, 3): DeckButton("Next", action="media_control__next"),
+        (2, 2): DeckButton("time: {builtin__time}"),
+    }
+
+
 class Deck:
     """Deck, the main point of the app."""
 
     config: dict[str, t.Any]
     plugins_config: dict[str, t.Any]
-    _actions: dict[str, ActionCallable]
-    _variables: dict[str, t.Any]
 
-    buttons: ButtonMatrix
-    _buttons_base: ButtonMatrix
-    _buttons_rendered: ButtonMatrix
+    pages: dict[str, Page]
+    icons: IconStore
 
-    _click_events: list[dict[str, t.Any]]
+    _click_events: queue.SimpleQueue[ClickEvent]
+    _action_executor: ActionExecutor
+    _debouncer: Debouncer
     _running: bool
+    _version: int
+    _lock: threading.Lock
+    _config_file: str | None
+    _watcher: Watcher
+    _wake_event: threading.Event
+    _next_plugin_update: float
     _plugin_manager: PluginManager
 
-    def __init__(self) -> None:
-        self._plugin_manager = PluginManager(plugin_dir=f"{PATH}/plugins")
-        self._variables = {}
-        self._click_events = []
+    metrics: Registry
+
+    def __init__(
+        self,
+        config: dict[str, t.Any] | None = None,
+        plugin_manager: PluginManager | None = None,
+    ) -> None:
+        """Create deck
+
+        Args:
+            config: configuration, loaded `config.json` by default,
+                which is then reloaded on change
+            plugin_manager: plugin manager, loading plugins from
+                `pydeck/plugins` by default
+        """
+        self.config = config or user_config
+        self._config_file = None if config else CONFIG_FILE
+        self._click_events = queue.SimpleQueue()
         self._running = True
+        self._lock = threading.Lock()
+        self._watcher = Watcher(self.config["reload"]["interval"])
+        self._wake_event = threading.Event()
+        self._next_plugin_update = 0
+        self._plugin_manager = plugin_manager or PluginManager(
+            plugin_dir=f"{PATH}/plugins",
+            workers=self.config["plugin_manager"]["workers"],
+            update_interval=self.config["plugin_manager"]["update_interval"],
+            update_timeout=self.config["plugin_manager"]["update_timeout"],
+            lazy=self.config["plugin_manager"]["lazy"],
+        )
+        self._plugin_manager.on_change = self.wake
+        self._action_executor = ActionExecutor(
+            workers=self.config["actions"]["workers"],
+            concurrency=self.config["actions"]["concurrency"],
+            queue_size=self.config["actions"]["queue"],
+            limits=self.config["actions"]["limits"],
+            on_done=self.wake,
+        )
+        self._debouncer = Debouncer(self.config["actions"]["debounce"])
+        self._init_metrics()
+
+        # Versions start from a timestamp, so versions held by clients
+        # of a previous run are older than any of ours
+        self._version = time.time_ns() // 1_000_000
+        self.pages = {}
+
+        icons_config = self.config["icons"]
+        self.icons = IconStore(
+            icons_config["directory"] or f"{PATH}/icons",
+            icons_config["cache_directory"] or f"{PATH}/.icon_cache",
+            memory_limit=icons_config["memory_cache"],
+            disk_limit=icons_config["disk_cache"],
+        )
 
         # User configurable
-        self.buttons = {
-            (0, 2): DeckButton("{media_control__title}\n{media_control__artist}"),
-            (1, 1): DeckButton("Previous", action="media_control__prev"),
-            (1, 2): DeckButton("Play/Pause", action="media_control__toggle_pause"),
-            (1, 3): DeckButton("Next", action="media_control__next"),
-            (2, 2): DeckButton("time: {builtin__time}"),
-        }
-        self.config = config
-
-        fill = True
-
-        # Blank dummy buttons
-        self._buttons_base = {
-            (x, y): DeckButton("&nbsp;" if fill else "")
-            for x, y in product(
-                range(self.config["deck"]["rows"]),
-                range(self.config["deck"]["cols"]),
-            )
-        }
-        # Rendered initialized buttons
-        self._buttons_rendered = {}
-
-        for _id in self.buttons:
+        self.set_pages(pages_from_config(self.config["deck"], self.icons))
+
+    def _init_metrics(self) -> None:
+        self.metrics = metrics = Registry(enabled=self.config["metrics"]["enabled"])
+
+        self._plugin_manager.instrument(metrics)
+        self._action_executor.instrument(metrics)
+
+        self._loop_iterations = metrics.counter(
+            "loop_iterations_total",
+            "Deck update loop iterations",
+        )
+        self._render_seconds = metrics.histogram(
+            "render_seconds",
+            "Time to render and publish changed buttons",
+        )
+        self._rendered_buttons = metrics.counter(
+            "rendered_buttons_total",
+            "Re-rendered buttons",
+        )
+        self._stream_resyncs = metrics.counter(
+            "stream_resyncs_total",
+            "Stream clients which fell behind and were sent the full state",
+        )
+        self._debounced_clicks = metrics.counter(
+            "clicks_debounced_total",
+            "Repeated taps dropped by debounce",
+        )
+        self._request_seconds = metrics.histogram(
+            "http_request_seconds",
+            "Web interface request handling time",
+            ["route", "method", "status"],
+        )
+        metrics.callback(
+            "gauge",
+            "click_queue_depth",
+            "Clicks waiting to be dispatched",
+            self._click_events.qsize,
+        )
+        metrics.callback(
+            "gauge",
+            "stream_clients",
+            "Connected stream clients",
+            lambda: sum(len(page.broadcaster) for page in list(self.pages.values())),
+        )
+        metrics.callback(
+            "gauge",
+            "viewed_pages",
+            "Pages being rendered for clients",
+            lambda: sum(page.viewed for page in list(self.pages.values())),
+        )
+
+    @property
+    def buttons(self) -> ButtonMatrix:
+        """Buttons of the default page"""
+        return self.pages[DEFAULT_PAGE].buttons
+
+    def set_buttons(self, buttons: ButtonMatrix, page: str = DEFAULT_PAGE) -> None:
+        """Replace buttons of page, creating it if needed
+
+        Only added and modified buttons are rendered on next update,
+        removed ones are published as blank
+        """
+        for _id in buttons:
             if (
                 _id[0] >= self.config["deck"]["rows"]
                 or _id[1] >= self.config["deck"]["cols"]
             ):
-                logger.warning("Button id is out of bounds: %s", _id)
+                logger.warning("Button id is out of bounds: %s (%s)", _id, page)
+
+        with self._lock:
+            if page not in self.pages:
+                self.pages[page] = Page(
+                    page,
+                    self.config["deck"]["rows"],
+                    self.config["deck"]["cols"],
+                    self._version,
+                    self.config["deck"]["history"],
+                    self.config["server"]["stream_buffer"],
+                )
+            self.pages[page].set_buttons(buttons)
+
+        self._plugin_manager.require(self._required_plugins())
+        self.wake()
+
+    def set_pages(self, pages: dict[str, ButtonMatrix]) -> None:
+        """Replace all pages, unchanged buttons are kept as rendered"""
+        for name, buttons in pages.items():
+            self.set_buttons(buttons, name)
+
+        with self._lock:
+            removed = [
+                self.pages.pop(name)
+                for name in self.pages.keys() - pages.keys() - {DEFAULT_PAGE}
+            ]
+            for page in removed:
+                # A page added again with the same name continues its versions
+                self._version = max(self._version, page.snapshots.current.version + 1)
+
+        for page in removed:
+            page.broadcaster.close()
+
+    def _required_plugins(self) -> set[str]:
+        """Plugins used by buttons of any page"""
+        return set().union(
+            *(page.required_plugins for page in list(self.pages.values())),
+        )
+
+    def reload_config(self) -> None:
+        """Read config file again, apply changed buttons and plugin settings"""
+        config = load_config()
+        logger.info("Config changed, reloading")
+
+        if (
+            config["deck"]["buttons"] != self.config["deck"]["buttons"]
+            or config["deck"]["pages"] != self.config["deck"]["pages"]
+        ):
+            self.config["deck"]["buttons"] = config["deck"]["buttons"]
+            self.config["deck"]["pages"] = config["deck"]["pages"]
+            self.set_pages(pages_from_config(config["deck"], self.icons))
+
+        if config["plugins"] != self.config["plugins"]:
+            self.config["plugins"] = config["plugins"]
+            self._plugin_manager.set_config(config["plugins"])
+
+        # The rest is read once on start
+        if changed := [key for key in config if config[key] != self.config.get(key)]:
+            logger.warning("Changes of %s config need a restart", ", ".join(changed))
+
+    def reload_icons(self) -> None:
+        """Resolve icon URLs again, after icon files changed"""
+        logger.info("Icons changed, reloading")
+        self.set_pages(pages_from_config(self.config["deck"], self.icons))
 
     def run(self) -> None:
-        """Start deck server."""
-        self._plugin_manager.load()
+        """Start deck server, block until stopped"""
+        self.start()
 
-        self._plugin_manager.set_config(self.config["plugins"])
+        while self._running:
+            time.sleep(1e6)
 
-        self._actions = self._plugin_manager.actions
+    def start(self) -> None:
+        """Start update loop and web interface threads, load plugins
+
+        Doesn't wait for plugins, their variables are shown as placeholders
+        until they are loaded
+        """
+        self._plugin_manager.set_config(self.config["plugins"])
 
         deck_update_loop = threading.Thread(target=self._run_update_loop, daemon=True)
         web_interface = threading.Thread(target=self._run_web_interface, daemon=True)
@@ -106,102 +365,538 @@ class Deck:
         deck_update_loop.start()
         web_interface.start()
 
-        while self._running:
-            time.sleep(1e6)
+        self._plugin_manager.load(wait=False, required=self._required_plugins())
+
+        if self.config["reload"]["enabled"]:
+            if self._config_file:
+                self._watcher.watch(
+                    functools.partial(file_mtime, self._config_file),
+                    self.reload_config,
+                )
+            self._watcher.watch(
+                self._plugin_manager.sources,
+                self._plugin_manager.reload,
+            )
+            self._watcher.watch(self.icons.sources, self.reload_icons)
+            self._watcher.start()
 
     def stop(self) -> None:
         """Stop deck server"""
         self._running = False
+        self._watcher.stop()
+        self._plugin_manager.stop()
+        self._action_executor.shutdown()
+        self.wake()
 
-    def update(self) -> None:
-        """Update deck"""
-        self._plugin_manager.update()
-
-        while self._click_events:
-            self._handle_click(self._click_events.pop(0))
-
-        self._variables.update(self._plugin_manager.variables)
+    def wake(self) -> None:
+        """Wake the update loop before its next scheduled deadline"""
+        self._wake_event.set()
 
-        temp_render = copy.deepcopy(self.buttons)
+    def update(self) -> None:
+        """Update deck
+
+        Only buttons using changed variables are re-rendered
+        """
+        self._loop_iterations.inc()
+        self._next_plugin_update = self._plugin_manager.update()
+
+        with self._lock:
+            while True:
+                try:
+                    event = self._click_events.get_nowait()
+                except queue.Empty:
+                    break
+                self._handle_click(event)
+
+            changed_variables = self._plugin_manager.store.collect_changes()
+            changed_names = [variable_name(key) for key in changed_variables]
+
+            for page in self.pages.values():
+                page.invalidate(changed_names)
+
+                # Pages nobody looks at keep their changes for later
+                if not page.viewed:
+                    continue
+
+                dirty, removed = page.take_changes()
+                if dirty or removed:
+                    with self._render_seconds.time():
+                        self._render(page, dirty, removed)
+                page.fresh.set()
+
+    def _render(
+        self,
+        page: Page,
+        dirty: t.Iterable[ButtonId],
+        removed: t.Collection[ButtonId] = (),
+    ) -> None:
+        """Render buttons of page, publish those which changed and removed ones"""
+        previous = page.snapshots.buttons
+        variables = self._plugin_manager.store.flat
+        placeholder = self.config["deck"]["placeholder"]
+        rendered: dict[ButtonId, DeckButton] = {}
+
+        for _id in dirty:
+            button = self._render_button(page.buttons[_id], variables, placeholder)
+            self._rendered_buttons.inc()
+
+            if (before := previous.get(_id)) is None or (
+                before is not button and before.as_json() != button.as_json()
+            ):
+                rendered[_id] = button
 
-        for button in temp_render.values():
-            button.format(**self._variables)
+        removed = [_id for _id in removed if _id in previous]
 
-        self._buttons_rendered = temp_render
+        if rendered or removed:
+            self._publish(page, rendered, removed)
 
-    def _handle_click(self, json: dict[str, t.Any]) -> None:
-        str_id = json.get("button_id")
+    def _render_button(
+        self,
+        button: DeckButton,
+        variables: t.Mapping[str, t.Any],
+        placeholder: str | None = None,
+    ) -> DeckButton:
+        try:
+            return button.render(variables, placeholder)
+        except (KeyError, AttributeError, IndexError, ValueError) as e:
+            logger.warning("Failed to render button %r: %r", button.text, e)
+            return button
+
+    def _publish(
+        self,
+        page: Page,
+        changed: dict[ButtonId, DeckButton],
+        removed: t.Collection[ButtonId] = (),
+    ) -> None:
+        """Publish new render generation of page to clients
+
+        Args:
+            page: rendered page
+            changed: re-rendered buttons which differ from the current snapshot
+            removed: ids of deleted buttons
+        """
+        snapshot = page.snapshots.publish(changed, removed)
+        # Encoded once, the same frame is sent to every stream client
+        frame = sse_message(page.snapshots.delta(snapshot.version - 1))
+        if resyncs := page.broadcaster.publish((snapshot.version, frame)):
+            self._stream_resyncs.inc(amount=resyncs)
+
+    def _handle_click(self, event: ClickEvent) -> None:
+        """Dispatch click to the action executor, doesn't wait for the action"""
+        str_id = event.data.get("button_id")
 
         if not isinstance(str_id, str) or not re.search(r"^\d+:\d+$", str_id):
             logger.warning("Invalid button_id: %s", str_id)
+            event.finish("invalid")
+            return
+
+        page_name = event.data.get("page", DEFAULT_PAGE)
+
+        if not isinstance(page_name, str):
+            logger.warning("Invalid page: %r", page_name)
+            event.finish("invalid")
             return
 
         tuple_id: ButtonId = tuple(map(int, str_id.split(":")[:2]))  # type: ignore[reportAssignmentType]
-        button: DeckButton | None = self.buttons.get(tuple_id)
+        page = self.pages.get(page_name)
+        button: DeckButton | None = page.buttons.get(tuple_id) if page else None
 
         if not button:
             logger.warning("Invalid button_id: %s", str_id)
+            event.finish("invalid")
             return
 
         logger.info("Button clicked: %s", str_id)
 
         if not button.action:
+            event.finish("ignored")
             return
 
         logger.info("Action: %s", button.action)
-        action_callable = self._actions.get(button.action)
+        action_callable = self._plugin_manager.action(button.action)
 
         if not action_callable:
             logger.warning("Invalid action: %s", button.action)
+            event.finish("invalid")
             return
 
-        try:
-            action_callable(**button.action_args)
-        except Exception:  # pylint: disable=broad-exception-caught
-            # We need to catch plugin-generated exceptions and
-            # log them to the user
-            plugin_name: str = button.action.split(PLUGIN_SEP)[0]
-            logger.exception("Plugin '%s' action error", plugin_name)
+        self._action_executor.submit(
+            button.action,
+            action_callable,
+            button.action_args,
+            event,
+        )
+
+    def receive_events(self, events: list[t.Any]) -> list[ClickEvent]:
+        """Queue a batch of client events
+
+        Events are `{"type": "click", "data": {...}, "id", "time"}`, `time`
+        is the client's timestamp (ms). Clicks on the same button within
+        the `actions.debounce` window are dropped; client timestamps place
+        taps of one batch relative to each other, as they may have been
+        queued for a while.
+
+        Returns events in the same order, with their status
+        """
+        received = time.time()
+        raw_events = [raw if isinstance(raw, dict) else {} for raw in events]
+        times = [_client_time(raw) for raw in raw_events]
+        latest = max((x for x in times if x is not None), default=None)
+        result: list[ClickEvent] = []
+
+        for raw, client_time in zip(raw_events, times, strict=True):
+            data = raw.get("data")
+            event = ClickEvent(
+                data if isinstance(data, dict) else {},
+                received,
+                event_id=raw.get("id"),
+            )
+            result.append(event)
+
+            if raw.get("type") != "click" or not isinstance(data, dict):
+                event.finish("invalid")
+                continue
+
+            page = data.get("page", DEFAULT_PAGE)
+            if not isinstance(page, str):
+                event.finish("invalid")
+                continue
+
+            tapped = received
+            if latest is not None and client_time is not None:
+                tapped -= (latest - client_time) / 1000
+
+            key = (page, str(data.get("button_id")))
+            if not self._debouncer.accept(key, tapped):
+                self._debounced_clicks.inc()
+                event.finish("debounced")
+                continue
+
+            self._click_events.put(event)
+
+        self.wake()
+        return result
 
     def _run_update_loop(self) -> None:
-        while self._running:
-            self.update()
+        frame_time = 1 / self.config["deck"]["max_fps"]
+        poll_interval = self.config["deck"]["poll_interval"]
 
-    def _run_web_interface(self) -> None:  # noqa: C901
+        while self._running:
+            started = time.monotonic()
+
+            try:
+                self.update()
+            except Exception:
+                # One bad event or plugin must not stop the deck
+                logger.exception("Deck update failed")
+
+            # Sleep until a click, a plugin or the next poll deadline wakes us up
+            deadline = min(started + poll_interval, self._next_plugin_update)
+            self._wake_event.wait(max(deadline - time.monotonic(), 0))
+            self._wake_event.clear()
+
+            # Cap render rate
+            if (elapsed := time.monotonic() - started) < frame_time:
+                time.sleep(frame_time - elapsed)
+
+    def _run_web_interface(self) -> None:
+        app = self._create_app()
+
+        server_config = self.config["server"]
+        host = server_config["host"]
+        port = server_config["port"]
+        mode = server_config["mode"]
+
+        logger.info("Running on http://%s:%s (%s server)", host, port, mode)
+
+        if mode == "waitress":
+            try:
+                import waitress
+            except ImportError:
+                logger.error(  # noqa: TRY400
+                    "Server mode 'waitress' requires the `server` extra (waitress), "
+                    "falling back to development server",
+                )
+            else:
+                waitress.serve(
+                    app,
+                    host=host,
+                    port=port,
+                    threads=server_config["threads"],
+                    channel_timeout=server_config["keepalive"],
+                    connection_limit=server_config["connection_limit"],
+                    ident="pydeck",
+                )
+                return
+        elif mode != "dev":
+            logger.warning("Unknown server mode '%s', using development server", mode)
+
+        app.run(host, port, threaded=True)
+
+    def _create_app(self) -> flask.Flask:  # noqa: C901
         app = flask.Flask(__name__)
+        app.json = JSONProvider(app)
+
+        compression_cache = CompressionCache()
+        compress_min_size = self.config["server"]["compress_min_size"]
+
+        if self.metrics.enabled:
+
+            @app.before_request
+            def start_timer() -> None:  # type: ignore[reportUnusedFunction]
+                flask.g.request_started = time.perf_counter()
+
+            @app.after_request
+            def observe_request(response: flask.Response) -> flask.Response:  # type: ignore[reportUnusedFunction]
+                rule = flask.request.url_rule
+                self._request_seconds.observe(
+                    time.perf_counter() - flask.g.request_started,
+                    rule.rule if rule else "",
+                    flask.request.method,
+                    str(response.status_code),
+                )
+                return response
 
         # Test GUI
 
+        assets = AssetBundle(
+            f"{ROOT}/public",
+            overrides={"config.js": client_config_js(self.config)},
+            inline_limit=self.config["server"]["inline_assets"],
+        )
+
         @app.get("/", defaults={"path": "index.html"})
         @app.get("/<path:path>")
         def index(path: str) -> flask.Response:  # type: ignore[reportUnusedFunction]
-            return flask.send_from_directory(f"{ROOT}/public", path)
+            if (found := assets.get(path)) is None:
+                flask.abort(404)
+
+            asset, immutable = found
+            encoding = flask.request.accept_encodings.best_match(
+                list(asset.encodings),
+                default="identity",
+            )
+
+            response = flask.Response(
+                asset.encodings[encoding],
+                content_type=asset.content_type,
+            )
+            if encoding != "identity":
+                response.headers["Content-Encoding"] = encoding
+            response.headers["Vary"] = "Accept-Encoding"
+            response.headers["Cache-Control"] = (
+                "public, max-age=31536000, immutable" if immutable else "no-cache"
+            )
+            # Strong ETag per representation
+            response.set_etag(f"{asset.etag}-{encoding}")
+            return response.make_conditional(flask.request)
+
+        @app.get("/icons/<digest>/<int:size>")
+        def icon(digest: str, size: int) -> flask.Response:  # type: ignore[reportUnusedFunction]
+            if (found := self.icons.get(digest, size)) is None:
+                flask.abort(404)
+
+            response = flask.Response(found.body, content_type=found.content_type)
+            # Content-hash URL, never changes
+            response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+            response.set_etag(found.etag)
+            return response.make_conditional(flask.request)
 
         # API (Client)
 
+        def view_page() -> Page:
+            """Page from `?page=`, rendered up to date if nobody viewed it"""
+            page = self.pages.get(flask.request.args.get("page", DEFAULT_PAGE))
+
+            if page is None:
+                flask.abort(404)
+
+            if page.view(PAGE_VIEW_TIMEOUT):
+                self.wake()
+                page.fresh.wait(PAGE_RENDER_TIMEOUT)
+
+            return page
+
+        def api_response(
+            body: bytes,
+            key: t.Hashable | None = None,
+            etag: str | None = None,
+            mimetype: str = "application/json",
+        ) -> flask.Response:
+            """Serialized response, compressed if client accepts it
+
+            Args:
+                body: serialized JSON, or `mimetype` content
+                key: identifies body, to compress it once for all clients
+                etag: strong ETag of body, makes response conditional
+                mimetype: content type of body
+            """
+            encoding = "identity"
+            if len(body) >= compress_min_size:
+                encoding = flask.request.accept_encodings.best_match(
+                    COMPRESSIONS,
+                    default="identity",
+                )
+
+            if encoding != "identity":
+                body = (
+                    compression_cache.compress(key, body, encoding)
+                    if key is not None
+                    else compress(body, encoding)
+                )
+
+            response = flask.Response(body, mimetype=mimetype)
+            response.headers["Vary"] = "Accept-Encoding"
+
+            if encoding != "identity":
+                response.headers["Content-Encoding"] = encoding
+
+            if etag is None:
+                return response
+
+            # Strong ETag per representation
+            response.set_etag(etag if encoding == "identity" else f"{etag}-{encoding}")
+            return response.make_conditional(flask.request)
+
+        def snapshot_response(page: Page, *, grid: bool) -> flask.Response:
+            """Buttons of page, `grid` includes blank cells
+
+            Clients accepting `wire.MIMETYPE` get binary frames, blank
+            cells are implied by the grid size there
+            """
+            snapshots = page.snapshots
+            binary = (
+                flask.request.accept_mimetypes.best_match(API_MIMETYPES)
+                == wire.MIMETYPE
+            )
+
+            if binary:
+                snapshot = snapshots.current
+                since = flask.request.args.get("since", -1, type=int)
+                response = api_response(
+                    snapshots.delta(since, binary=True),
+                    key=(page.name, snapshot.version, since, binary),
+                    etag=f"{snapshot.etag}-wire" if since == -1 else None,
+                    mimetype=wire.MIMETYPE,
+                )
+            elif (since := flask.request.args.get("since", type=int)) is not None:
+                snapshot = snapshots.current
+                response = api_response(
+                    snapshots.delta(since),
+                    key=(page.name, snapshot.version, since),
+                )
+            else:
+                if grid:
+                    snapshot, body = page.grid()
+                    etag = f"{snapshot.etag}-grid"
+                else:
+                    snapshot, body = snapshots.full()
+                    etag = snapshot.etag
+                response = api_response(
+                    body,
+                    key=(page.name, snapshot.version, etag),
+                    etag=etag,
+                )
+
+            response.headers["Vary"] = "Accept, Accept-Encoding"
+            response.headers.add("Cache-Control", "no-cache")
+            response.headers.add("X-Deck-Version", str(snapshot.version))
+            return response
+
         @app.get("/api/<path:path>")
         def api_any(path: str) -> flask.Response:  # type: ignore[reportUnusedFunction]
             if path == "config":
                 logger.info("New connection: %s", flask.request.remote_addr)
-                response = flask.jsonify(self.config)
+                response = api_response(dumps(self.config))
             elif path == "buttons":
-                buttons = buttons_as_list(self._buttons_base | self._buttons_rendered)
-
-                response = flask.jsonify(buttons)
+                response = snapshot_response(view_page(), grid=True)
             elif path == "buttons_nonblank":
-                buttons = buttons_as_list(self._buttons_rendered)
-                response = flask.jsonify(buttons)
+                response = snapshot_response(view_page(), grid=False)
+            elif path == "pages":
+                response = api_response(dumps(list(self.pages)))
             else:
                 response = flask.Response()
             response.headers.add("Access-Control-Allow-Origin", "*")
             return response
 
+        @app.get("/api/metrics")
+        def api_metrics() -> flask.Response:  # type: ignore[reportUnusedFunction]
+            if not self.metrics.enabled:
+                flask.abort(404)
+
+            return flask.Response(
+                self.metrics.render(),
+                content_type="text/plain; version=0.0.4; charset=utf-8",
+            )
+
+        @app.get("/api/stream")
+        def api_stream() -> flask.Response:  # type: ignore[reportUnusedFunction]
+            page = self.pages.get(flask.request.args.get("page", DEFAULT_PAGE))
+
+            if page is None:
+                flask.abort(404)
+
+            def stream() -> t.Iterator[bytes]:
+                # Page is rendered while it has subscribers
+                subscription = page.broadcaster.subscribe()
+                self.wake()
+                try:
+                    # Full state first, then only changed buttons
+                    message: t.Any = RESYNC
+                    sent = -1
+                    while self._running:
+                        if message is CLOSED:
+                            # Page was removed, client shows the default one
+                            yield sse_message(
+                                dumps({"page": DEFAULT_PAGE}),
+                                event="gone",
+                            )
+                            break
+                        if message is not None:
+                            version, frame = (
+                                page.full_frame() if message is RESYNC else message
+                            )
+                            # Deltas queued before a resync are already included
+                            if version > sent:
+                                sent = version
+                                yield frame
+                        try:
+                            message = subscription.get(timeout=STREAM_KEEPALIVE)
+                        except queue.Empty:
+                            message = None
+                            # Also detects disconnected clients
+                            yield b": keep-alive\n\n"
+                finally:
+                    page.broadcaster.unsubscribe(subscription)
+
+            response = flask.Response(stream(), mimetype="text/event-stream")
+            response.headers.add("Cache-Control", "no-cache")
+            response.headers.add("X-Accel-Buffering", "no")
+            response.headers.add("Access-Control-Allow-Origin", "*")
+            return response
+
         @app.post("/api/event")
         def api_event() -> flask.Response:  # type: ignore[reportUnusedFunction]
-            json = flask.request.get_json()
-            if json.get("type") == "click":
-                self._click_events.append(json.get("data"))
-            response = flask.Response("bruh")
+            payload = flask.request.get_json()
+            # Batch `{"events": [...]}` or a single event
+            if isinstance(payload, dict) and "events" in payload:
+                payload = payload["events"]
+            batch = payload if isinstance(payload, list) else [payload]
+
+            if len(batch) > EVENT_BATCH_LIMIT:
+                flask.abort(413)
+
+            events = self.receive_events(batch)
+
+            # `?wait=<seconds>` acks once actions completed
+            wait = flask.request.args.get("wait", 0, type=float)
+            deadline = time.monotonic() + min(wait, EVENT_WAIT_LIMIT)
+            for event in events:
+                if (remaining := deadline - time.monotonic()) <= 0:
+                    break
+                event.done.wait(remaining)
+
+            response = api_response(dumps({"events": [e.ack() for e in events]}))
             response.headers.add("Access-Control-Allow-Origin", "*")
             response.headers.add("Access-Control-Allow-Methods", "GET, POST")
             response.headers.add("Access-Control-Allow-Headers", "*")
@@ -210,17 +905,13 @@ class Deck:
         # API (Server config)
         @app.get("/api/actions_list")
         def api_action_list() -> flask.Response:  # type: ignore[reportUnusedFunction]
-            return flask.jsonify(list(self._actions.keys()))
+            return api_response(dumps(list(self._plugin_manager.actions.keys())))
 
         @app.get("/api/action_details/<path:path>")
         def api_action(path: str) -> flask.Response:  # type: ignore[reportUnusedFunction]
-            if path in self._actions:
-                return flask.jsonify(self._actions[path])
+            if action := self._plugin_manager.action(path):
+                return flask.jsonify(action)
 
             return flask.Response()
 
-        host = self.config["server"]["host"]
-        port = self.config["server"]["port"]
-
-        logger.info("Running on http://%s:%s", host, port)
-        app.run(host, port)
+        return app
@@ -0,0 +1,182 @@
+"""Periodic jobs executed in a bounded thread pool"""
+
+from __future__ import annotations
+
+__all__ = ["Job", "Scheduler"]
+
+import asyncio
+import inspect
+import logging
+import threading
+import time
+import typing as t
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+if t.TYPE_CHECKING:
+    from pydeck.aio import EventLoopThread
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class Job:
+    """Periodic job state and statistics"""
+
+    name: str
+    func: t.Callable[[], t.Any]
+    interval: float
+    is_async: bool = False
+    # Next due time from the current one, instead of a fixed interval
+    schedule: t.Callable[[float], float] | None = field(default=None, repr=False)
+    next_run: float = 0
+    future: Future[t.Any] | None = field(default=None, repr=False)
+    started: float = 0
+    runs: int = 0
+    errors: int = 0
+    overruns: int = 0
+    last_duration: float = 0
+    timed_out: bool = False
+
+
+class Scheduler:
+    """Runs jobs at their interval in a thread pool
+
+    Coroutine function jobs run on the event loop instead.
+
+    A job is never run concurrently with itself: if it is still running
+    when it is due again, the run is skipped. A run taking longer than
+    `timeout` is counted as an overrun. Async jobs are cancelled then;
+    threads can't be killed, so sync jobs are just not rescheduled
+    until they return.
+    """
+
+    jobs: dict[str, Job]
+    timeout: float
+    _executor: ThreadPoolExecutor
+    _loop: EventLoopThread | None
+    _lock: threading.Lock
+
+    def __init__(
+        self,
+        workers: int,
+        timeout: float,
+        loop: EventLoopThread | None = None,
+    ) -> None:
+        self.jobs = {}
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(workers, thread_name_prefix="scheduler")
+        self._loop = loop
+        self._lock = threading.Lock()
+
+    def add(
+        self,
+        name: str,
+        func: t.Callable[[], t.Any],
+        interval: float,
+        schedule: t.Callable[[float], float] | None = None,
+    ) -> None:
+        """Add (or replace) job, it is due immediately
+
+        Args:
+            name: job name
+            func: function or coroutine function to run
+            interval: seconds between runs
+            schedule: computes next due time (`time.monotonic`) from the
+                current one instead, for runs aligned to the clock
+        """
+        is_async = inspect.iscoroutinefunction(func)
+
+        if is_async and self._loop is None:
+            msg = "Scheduler has no event loop for async jobs"
+            raise ValueError(msg)
+
+        with self._lock:
+            self.jobs[name] = Job(name, func, interval, is_async, schedule)
+
+    def remove(self, name: str) -> None:
+        """Remove job, running call is not interrupted"""
+        with self._lock:
+            self.jobs.pop(name, None)
+
+    def tick(self) -> float:
+        """Submit due jobs, check running ones for timeout
+
+        Returns time (`time.monotonic`) when next job is due
+        """
+        now = time.monotonic()
+        next_run = now + 1
+
+        with self._lock:
+            jobs = tuple(self.jobs.values())
+
+        for job in jobs:
+            if job.future and not job.future.done():
+                if (
+                    not job.is_async
+                    and not job.timed_out
+                    and now - job.started > self.timeout
+                ):
+                    job.timed_out = True
+                    job.overruns += 1
+                    logger.warning(
+                        "Job '%s' is running for more than %ss",
+                        job.name,
+                        self.timeout,
+                    )
+                continue
+
+            if now >= job.next_run:
+                job.started = now
+                job.timed_out = False
+                if job.schedule:
+                    job.next_run = job.schedule(now)
+                else:
+                    # Schedule from previous due time, so run time doesn't
+                    # shift the interval. Skip missed runs instead of catching up
+                    job.next_run += job.interval
+                    if job.next_run <= now:
+                        job.next_run = now + job.interval
+                if job.is_async:
+                    job.future = self._loop.submit(self._run_async(job))  # type: ignore[reportOptionalMemberAccess]
+                else:
+                    job.future = self._executor.submit(self._run, job)
+
+            next_run = min(next_run, job.next_run)
+
+        return next_run
+
+    def shutdown(self) -> None:
+        """Stop accepting jobs, don't wait for running ones"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, job: Job) -> None:
+        started = time.perf_counter()
+
+        try:
+            job.func()
+        except Exception:
+            job.errors += 1
+            logger.exception("Job '%s' error", job.name)
+        finally:
+            job.runs += 1
+            job.last_duration = time.perf_counter() - started
+
+    async def _run_async(self, job: Job) -> None:
+        started = time.perf_counter()
+
+        try:
+            await asyncio.wait_for(job.func(), self.timeout)
+        except TimeoutError:
+            job.overruns += 1
+            logger.warning(
+                "Job '%s' was cancelled after %ss",
+                job.name,
+                self.timeout,
+            )
+        except Exception:
+            job.errors += 1
+            logger.exception("Job '%s' error", job.name)
+        finally:
+            job.runs += 1
+            job.last_duration = time.perf_counter() - started
@@ -0,0 +1,180 @@
+"""Rendered deck snapshots"""
+
+from __future__ import annotations
+
+__all__ = ["Snapshot", "SnapshotLog", "serialize_buttons"]
+
+import collections
+import functools
+import threading
+import types
+import typing as t
+from dataclasses import dataclass
+
+from pydeck.codec import dumps
+from pydeck.wire import encode_frame
+
+if t.TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Mapping
+
+    from pydeck.button import Button
+    from pydeck.typing import ButtonId
+
+
+def serialize_buttons(items: Iterable[tuple[ButtonId, Button]]) -> bytes:
+    """JSON list of buttons with ids, joined from cached button fragments"""
+    return b"[%s]" % b",".join(
+        b'{"id":[%d,%d],%s}' % (_id[0], _id[1], button.as_json())
+        for _id, button in items
+    )
+
+
+@dataclass(frozen=True, slots=True)
+class Snapshot:
+    """One render generation of a page
+
+    Versions of a page are never reused (they start from a timestamp),
+    so the version identifies the content
+    """
+
+    version: int
+
+    @property
+    def etag(self) -> str:
+        return f"{self.version:x}"
+
+
+class SnapshotLog:
+    """Current buttons with a bounded log of changed button ids per version
+
+    Publishing updates buttons in place, so it costs only the changed
+    ones. Serialized forms are made on demand, once per version. Lets
+    clients fetch only what changed since a version they already hold.
+    """
+
+    current: Snapshot
+    buttons: Mapping[ButtonId, Button]
+    _buttons: dict[ButtonId, Button]
+    _log: collections.deque[tuple[int, frozenset[ButtonId]]]
+    _cache: dict[t.Hashable, bytes]
+    _lock: threading.Lock
+
+    def __init__(self, version: int, maxlen: int) -> None:
+        """Create log
+
+        Args:
+            version: version of the initial, empty snapshot
+            maxlen: number of versions deltas can be made from
+        """
+        self.current = Snapshot(version)
+        self._buttons = {}
+        # Read only in the publishing thread, others use `serialized`
+        self.buttons = types.MappingProxyType(self._buttons)
+        self._log = collections.deque(maxlen=maxlen)
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def publish(
+        self,
+        changed: Mapping[ButtonId, Button],
+        removed: Iterable[ButtonId] = (),
+    ) -> Snapshot:
+        """Make a new version with changed and without removed buttons"""
+        removed = frozenset(removed)
+
+        with self._lock:
+            self._buttons.update(changed)
+            for _id in removed:
+                self._buttons.pop(_id, None)
+
+            self.current = snapshot = Snapshot(self.current.version + 1)
+            self._log.append((snapshot.version, removed.union(changed)))
+            self._cache = {}
+
+        return snapshot
+
+    def serialized(
+        self,
+        key: t.Hashable,
+        serialize: Callable[[Mapping[ButtonId, Button]], bytes],
+    ) -> tuple[Snapshot, bytes]:
+        """Current snapshot and its buttons serialized by `serialize`
+
+        Made once per version and `key`. `serialize` runs under the lock,
+        so buttons don't change meanwhile.
+        """
+        with self._lock:
+            return self.current, self._serialize(key, serialize)
+
+    def full(self) -> tuple[Snapshot, bytes]:
+        """Current snapshot and JSON list of its buttons"""
+        return self.serialized("full", _serialize_all)
+
+    def delta(self, since: int, *, binary: bool = False) -> bytes:
+        """Serialize changes made after version `since`
+
+        `{"version", "full": false, "buttons": [...], "removed": [ids]}`.
+        Falls back to the full snapshot (`"full": true`) if the version
+        is unknown or too old to be in the log. With `binary`, encoded
+        as a `pydeck.wire` frame instead.
+        """
+        with self._lock:
+            version = self.current.version
+            oldest = self._log[0][0] - 1 if self._log else version
+
+            if not oldest <= since <= version:
+                since = -1
+
+            return self._serialize(
+                ("delta", since, binary),
+                functools.partial(self._delta, version, since, binary=binary),
+            )
+
+    def _serialize(
+        self,
+        key: t.Hashable,
+        serialize: Callable[[Mapping[ButtonId, Button]], bytes],
+    ) -> bytes:
+        if (body := self._cache.get(key)) is None:
+            body = self._cache[key] = serialize(self._buttons)
+
+        return body
+
+    def _delta(
+        self,
+        version: int,
+        since: int,
+        buttons: Mapping[ButtonId, Button],
+        *,
+        binary: bool,
+    ) -> bytes:
+        if since == -1:
+            if binary:
+                return encode_frame(version, full=True, buttons=buttons.items())
+
+            return b'{"version":%d,"full":true,"buttons":%s}' % (
+                version,
+                self._serialize("full", _serialize_all),
+            )
+
+        changed: set[ButtonId] = set()
+        for logged, ids in reversed(self._log):
+            if logged <= since:
+                break
+            changed |= ids
+
+        present = [(_id, buttons[_id]) for _id in changed if _id in buttons]
+        removed = [_id for _id in changed if _id not in buttons]
+
+        if binary:
+            return encode_frame(version, full=False, buttons=present, removed=removed)
+
+        return b'{"version":%d,"full":false,"buttons":%s,"removed":%s}' % (
+            version,
+            serialize_buttons(present),
+            dumps(removed),
+        )
+
+
+def _serialize_all(buttons: Mapping[ButtonId, Button]) -> bytes:
+    return serialize_buttons(buttons.items())
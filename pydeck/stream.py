@@ -0,0 +1,139 @@
+"""Server-push of deck changes"""
+
+from __future__ import annotations
+
+__all__ = ["CLOSED", "RESYNC", "Broadcaster", "Subscription", "sse_message"]
+
+import collections
+import queue
+import threading
+import typing as t
+
+RESYNC: t.Final = object()  # Subscriber fell behind and needs the full state
+CLOSED: t.Final = object()  # Broadcaster was closed, no more messages follow
+
+
+def sse_message(data: bytes, event: str | None = None) -> bytes:
+    """Format serialized data as a Server-Sent Events message"""
+    message = b"data: %s\n\n" % data
+
+    if event:
+        message = b"event: %s\n%s" % (event.encode(), message)
+
+    return message
+
+
+class Subscription:
+    """Messages published to one subscriber, at most `maxsize` pending
+
+    A subscriber which lets `maxsize` messages pile up is too slow to
+    catch up: pending messages are dropped and replaced by `RESYNC`, so
+    memory stays bounded and the subscriber sends the full state instead
+    """
+
+    maxsize: int
+    closed: bool
+    _messages: collections.deque[t.Any]
+    _ready: threading.Condition
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self.closed = False
+        self._messages = collections.deque()
+        self._ready = threading.Condition(threading.Lock())
+
+    def __len__(self) -> int:
+        return len(self._messages)
+
+    def put(self, message: t.Any) -> bool:  # noqa: ANN401
+        """Queue message
+
+        Returns False if the subscriber overflowed and has to resync
+        """
+        with self._ready:
+            if self.closed:
+                return True
+            if overflow := len(self._messages) >= self.maxsize:
+                self._messages.clear()
+                message = RESYNC
+            self._messages.append(message)
+            self._ready.notify()
+
+        return not overflow
+
+    def get(self, timeout: float | None = None) -> t.Any:  # noqa: ANN401
+        """Wait for next message
+
+        Raises `queue.Empty` if none arrives within timeout
+        """
+        with self._ready:
+            if not self._ready.wait_for(lambda: self._messages, timeout):
+                raise queue.Empty
+            return self._messages.popleft()
+
+    def close(self) -> None:
+        """Drop pending messages, `CLOSED` is the last one received"""
+        with self._ready:
+            self.closed = True
+            self._messages.clear()
+            self._messages.append(CLOSED)
+            self._ready.notify()
+
+
+class Broadcaster:
+    """Fan-out of published messages to every subscriber
+
+    Messages are shared, not copied, so publish pre-encoded frames.
+    Each subscriber gets its own bounded queue, so a client reading
+    slowly doesn't delay others nor hold unbounded memory.
+    """
+
+    maxsize: int
+    closed: bool
+    _subscribers: set[Subscription]
+    _lock: threading.Lock
+
+    def __init__(self, maxsize: int = 32) -> None:
+        self.maxsize = maxsize
+        self.closed = False
+        self._subscribers = set()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self) -> Subscription:
+        """Create a queue receiving every message published from now on"""
+        subscription = Subscription(self.maxsize)
+
+        with self._lock:
+            if self.closed:
+                subscription.close()
+            else:
+                self._subscribers.add(subscription)
+
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """Stop delivering messages to the queue"""
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def publish(self, message: t.Any) -> int:  # noqa: ANN401
+        """Send message to every subscriber
+
+        Returns number of subscribers which overflowed and have to resync
+        """
+        with self._lock:
+            subscribers = tuple(self._subscribers)
+
+        return sum(not subscription.put(message) for subscription in subscribers)
+
+    def close(self) -> None:
+        """Close every subscription, later ones are created closed"""
+        with self._lock:
+            self.closed = True
+            subscribers, self._subscribers = self._subscribers, set()
+
+        for subscription in subscribers:
+            subscription.close()
@@ -0,0 +1,113 @@
+"""Compiled button text templates"""
+
+from __future__ import annotations
+
+__all__ = ["Template"]
+
+import string
+import sys
+import typing as t
+
+if t.TYPE_CHECKING:
+    from collections.abc import Mapping
+
+_formatter = string.Formatter()
+
+# Variable sets shared by templates, most buttons use the same few
+_variable_sets: dict[frozenset[str], frozenset[str]] = {}
+
+
+def _root_name(field_name: str) -> str:
+    """Get variable name from field (`var.attr[0]` -> `var`)"""
+    return field_name.split(".", 1)[0].split("[", 1)[0]
+
+
+class Template:
+    """`str.format` template parsed once
+
+    Keeps the names of variables it references, so it is re-rendered
+    only when one of them changes
+    """
+
+    __slots__ = ("_constant", "_parts", "source", "variables")
+
+    source: str
+    variables: frozenset[str]
+    _parts: tuple[tuple[str, str | None, str, Template | None, str | None], ...]
+    _constant: str | None
+
+    def __init__(self, source: str) -> None:
+        self.source = source
+
+        parts: list[tuple[str, str | None, str, Template | None, str | None]] = []
+        variables: set[str] = set()
+
+        for literal, field_name, spec, conversion in _formatter.parse(source):
+            if field_name is None:
+                parts.append((literal, None, "", None, None))
+                continue
+
+            if not field_name or field_name.isdigit():
+                msg = f"Positional field in template: {source!r}"
+                raise ValueError(msg)
+
+            spec_template = Template(spec) if spec else None
+            if spec_template:
+                variables |= spec_template.variables
+
+            root = sys.intern(_root_name(field_name))
+            variables.add(root)
+            parts.append(
+                (literal, sys.intern(field_name), root, spec_template, conversion),
+            )
+
+        self._parts = tuple(parts)
+        names = frozenset(variables)
+        self.variables = _variable_sets.setdefault(names, names)
+        self._constant = (
+            None if variables else "".join(literal for literal, *_ in parts)
+        )
+
+    def render(
+        self,
+        variables: Mapping[str, t.Any],
+        missing: str | None = None,
+    ) -> str:
+        """Substitute variables
+
+        Args:
+            variables: name -> value
+            missing: text of fields whose variable, or a variable of
+                their format spec, is missing; they raise KeyError if None
+
+        Raises:
+            KeyError: referenced variable is missing
+        """
+        if self._constant is not None:
+            return self._constant
+
+        chunks: list[str] = []
+
+        for literal, field_name, root, spec, conversion in self._parts:
+            chunks.append(literal)
+
+            if field_name is None:
+                continue
+
+            if missing is not None and (
+                root not in variables
+                or (spec and not all(name in variables for name in spec.variables))
+            ):
+                chunks.append(missing)
+                continue
+
+            value, _ = _formatter.get_field(field_name, (), variables)
+            value = _formatter.convert_field(value, conversion)
+            chunks.append(
+                format(value, spec.render(variables, missing) if spec else "")
+            )
+
+        return "".join(chunks)
+
+    def __repr__(self) -> str:
+        return f"Template({self.source!r})"
@@ -0,0 +1,152 @@
+"""Plugin variables store"""
+
+from __future__ import annotations
+
+__all__ = ["PLUGIN_SEP", "VariableKey", "VariableStore", "variable_name"]
+
+import threading
+import types
+import typing as t
+
+if t.TYPE_CHECKING:
+    from collections.abc import Callable, Mapping
+
+PLUGIN_SEP = "__"  # Separator for plugin's variables and methods
+
+VariableKey: t.TypeAlias = tuple[str, str]  # (plugin_id, name)
+Subscriber: t.TypeAlias = "Callable[[VariableKey, t.Any], None]"
+
+_MISSING = object()
+
+
+def variable_name(key: VariableKey) -> str:
+    """Name used in button templates (`plugin__name`)"""
+    return f"{key[0]}{PLUGIN_SEP}{key[1]}"
+
+
+class VariableStore:
+    """Persistent variables of all plugins
+
+    Every key carries the store version at which it last changed.
+    Changed keys accumulate until `collect_changes`, so a consumer sees
+    only what changed since its previous tick.
+    """
+
+    version: int
+    _values: dict[VariableKey, t.Any]
+    _versions: dict[VariableKey, int]
+    _flat: dict[str, t.Any]
+    _names: dict[str, set[str]]
+    _changed: set[VariableKey]
+    _subscribers: dict[VariableKey, list[Subscriber]]
+    _lock: threading.Lock
+
+    def __init__(self) -> None:
+        self.version = 0
+        self._values = {}
+        self._versions = {}
+        self._flat = {}
+        self._names = {}
+        self._changed = set()
+        self._subscribers = {}
+        self._lock = threading.Lock()
+
+    @property
+    def flat(self) -> Mapping[str, t.Any]:
+        """Read-only view of values by template name (`plugin__name`)"""
+        return types.MappingProxyType(self._flat)
+
+    def get(self, plugin_id: str, name: str, default: t.Any = None) -> t.Any:  # noqa: ANN401
+        return self._values.get((plugin_id, name), default)
+
+    def key_version(self, plugin_id: str, name: str) -> int:
+        """Version at which variable last changed, 0 if it doesn't exist"""
+        return self._versions.get((plugin_id, name), 0)
+
+    def set(self, plugin_id: str, name: str, value: t.Any) -> bool:  # noqa: ANN401
+        """Set variable
+
+        Returns whether it changed
+        """
+        return bool(self.update(plugin_id, {name: value}))
+
+    def update(
+        self,
+        plugin_id: str,
+        variables: Mapping[str, t.Any],
+        *,
+        replace: bool = False,
+    ) -> set[VariableKey]:
+        """Set plugin's variables
+
+        Args:
+            plugin_id: plugin the variables belong to
+            variables: name -> value
+            replace: also delete plugin's variables missing in `variables`
+
+        Returns changed keys
+        """
+        changed: set[VariableKey] = set()
+
+        with self._lock:
+            names = self._names.setdefault(plugin_id, set())
+
+            for name, value in variables.items():
+                key = (plugin_id, name)
+                if self._values.get(key, _MISSING) != value:
+                    self._values[key] = value
+                    self._flat[variable_name(key)] = value
+                    names.add(name)
+                    changed.add(key)
+
+            if replace:
+                for name in names - variables.keys():
+                    key = (plugin_id, name)
+                    del self._values[key]
+                    del self._flat[variable_name(key)]
+                    names.discard(name)
+                    changed.add(key)
+
+            if changed:
+                self.version += 1
+                for key in changed:
+                    self._versions[key] = self.version
+                self._changed |= changed
+
+        self._notify(changed)
+        return changed
+
+    def remove_plugin(self, plugin_id: str) -> set[VariableKey]:
+        """Delete all variables of plugin
+
+        Returns deleted keys
+        """
+        return self.update(plugin_id, {}, replace=True)
+
+    def collect_changes(self) -> set[VariableKey]:
+        """Get keys changed since previous call"""
+        with self._lock:
+            changed, self._changed = self._changed, set()
+
+        return changed
+
+    def subscribe(self, key: VariableKey, callback: Subscriber) -> None:
+        """Call `callback(key, value)` when variable changes
+
+        Called from the thread which changed the variable
+        """
+        with self._lock:
+            self._subscribers.setdefault(key, []).append(callback)
+
+    def unsubscribe(self, key: VariableKey, callback: Subscriber) -> None:
+        with self._lock:
+            if callback in (subscribers := self._subscribers.get(key, [])):
+                subscribers.remove(callback)
+
+    def _notify(self, changed: set[VariableKey]) -> None:
+        if not self._subscribers:
+            return
+
+        for key in changed:
+            for callback in tuple(self._subscribers.get(key, ())):
+                callback(key, self._values.get(key))
@@ -0,0 +1,83 @@
+"""Polling file watcher"""
+
+from __future__ import annotations
+
+__all__ = ["Watcher", "file_mtime"]
+
+import logging
+import threading
+import typing as t
+from dataclasses import dataclass
+from pathlib import Path
+
+if t.TYPE_CHECKING:
+    from collections.abc import Callable
+
+logger = logging.getLogger(__name__)
+
+
+def file_mtime(path: str) -> float | None:
+    """Modification time of file, None if it doesn't exist"""
+    try:
+        return Path(path).stat().st_mtime
+    except OSError:
+        return None
+
+
+@dataclass(slots=True)
+class _Watch:
+    probe: Callable[[], t.Any]
+    callback: Callable[[], None]
+    state: t.Any
+
+
+class Watcher:
+    """Calls callbacks when watched state changes
+
+    State is read by a probe function (e.g. file mtime) every `interval`
+    seconds in a daemon thread. Polling works the same on every platform
+    and the probes are cheap, a few `stat` calls.
+    """
+
+    interval: float
+    _watches: list[_Watch]
+    _stop_event: threading.Event
+    _thread: threading.Thread | None
+
+    def __init__(self, interval: float = 1.0) -> None:
+        self.interval = interval
+        self._watches = []
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def watch(self, probe: Callable[[], t.Any], callback: Callable[[], None]) -> None:
+        """Call `callback` when value returned by `probe` changes"""
+        self._watches.append(_Watch(probe, callback, probe()))
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name="watcher", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+    def poll(self) -> None:
+        """Check all watches now, in the calling thread"""
+        for watch in self._watches:
+            if (state := watch.probe()) == watch.state:
+                continue
+
+            watch.state = state
+
+            try:
+                watch.callback()
+            except Exception:
+                # Broken config or plugin must not stop watching
+                logger.exception("Reload failed")
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            self.poll()
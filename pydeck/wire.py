@@ -0,0 +1,169 @@
+"""Compact binary encoding of button frames
+
+Alternative to JSON deltas for low-bandwidth clients and large decks,
+sent to clients which accept `MIMETYPE`. A frame is a MessagePack array
+(encoded with `msgpack` if it's installed):
+
+    [version, full, styles, buttons, removed]
+
+- `styles`: `[[text_align, font_family, font_size], ...]` used in the frame
+- `buttons`: flat `[id, text, style, icon, id, text, style, icon, ...]`,
+  `style` is an index into `styles`, `icon` is nil if there is none
+- `removed`: ids of removed buttons
+- `id`: `row << 16 | col`
+
+Same semantics as JSON deltas: with `full`, buttons missing from the
+frame are blank.
+"""
+
+from __future__ import annotations
+
+__all__ = ["MIMETYPE", "encode_frame", "pack_id", "packb"]
+
+import struct
+import typing as t
+
+try:
+    import msgpack  # type: ignore[reportMissingImports]
+except ImportError:
+    msgpack = None
+
+if t.TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from pydeck.button import Button, Style
+    from pydeck.typing import ButtonId
+
+MIMETYPE = "application/x-msgpack"
+
+
+def pack_id(_id: ButtonId) -> int:
+    return _id[0] << 16 | _id[1]
+
+
+def encode_frame(
+    version: int,
+    *,
+    full: bool,
+    buttons: Iterable[tuple[ButtonId, Button]],
+    removed: Iterable[ButtonId] = (),
+) -> bytes:
+    """Encode buttons with ids as a frame"""
+    styles: dict[Style, int] = {}
+    flat: list[t.Any] = []
+
+    for _id, button in buttons:
+        style = styles.setdefault(button.style, len(styles))
+        flat += (pack_id(_id), button.text, style, button.icon)
+
+    return packb(
+        [
+            version,
+            full,
+            [[s.text_align, s.font_family, s.font_size] for s in styles],
+            flat,
+            [pack_id(_id) for _id in removed],
+        ],
+    )
+
+
+def packb(obj: t.Any) -> bytes:  # noqa: ANN401
+    """Serialize to MessagePack
+
+    Supports None, bool, int, float, str, bytes, lists, tuples and dicts
+    """
+    if msgpack is not None:
+        return msgpack.packb(obj)
+
+    out = bytearray()
+    _pack(obj, out)
+    return bytes(out)
+
+
+def _pack(obj: t.Any, out: bytearray) -> None:  # noqa: ANN401, C901
+    if obj is None:
+        out.append(0xC0)
+    elif obj is True:
+        out.append(0xC3)
+    elif obj is False:
+        out.append(0xC2)
+    elif isinstance(obj, int):
+        _pack_int(obj, out)
+    elif isinstance(obj, str):
+        data = obj.encode()
+        n = len(data)
+        if n < 0x20:
+            out.append(0xA0 | n)
+        elif n <= 0xFF:
+            out += struct.pack(">BB", 0xD9, n)
+        elif n <= 0xFFFF:
+            out += struct.pack(">BH", 0xDA, n)
+        else:
+            out += struct.pack(">BI", 0xDB, n)
+        out += data
+    elif isinstance(obj, (list, tuple)):
+        _pack_header(len(obj), 0x90, 0xDC, out)
+        for item in obj:
+            _pack(item, out)
+    elif isinstance(obj, dict):
+        _pack_header(len(obj), 0x80, 0xDE, out)
+        for key, value in obj.items():
+            _pack(key, out)
+            _pack(value, out)
+    elif isinstance(obj, float):
+        out += struct.pack(">Bd", 0xCB, obj)
+    elif isinstance(obj, (bytes, bytearray)):
+        n = len(obj)
+        if n <= 0xFF:
+            out += struct.pack(">BB", 0xC4, n)
+        elif n <= 0xFFFF:
+            out += struct.pack(">BH", 0xC5, n)
+        else:
+            out += struct.pack(">BI", 0xC6, n)
+        out += obj
+    else:
+        msg = f"Can't serialize {type(obj).__name__} to MessagePack"
+        raise TypeError(msg)
+
+
+def _pack_int(n: int, out: bytearray) -> None:
+    if 0 <= n < 0x80 or -0x20 <= n < 0:
+        out += struct.pack(">b" if n < 0 else ">B", n)
+    elif n >= 0:
+        for code, fmt, limit in _UINTS:
+            if n <= limit:
+                out += struct.pack(fmt, code, n)
+                return
+        msg = "Integer is too large for MessagePack"
+        raise OverflowError(msg)
+    else:
+        for code, fmt, limit in _INTS:
+            if n >= limit:
+                out += struct.pack(fmt, code, n)
+                return
+        msg = "Integer is too small for MessagePack"
+        raise OverflowError(msg)
+
+
+def _pack_header(n: int, fixed: int, code: int, out: bytearray) -> None:
+    """Array or map header, `code` is the 16-bit form, 32-bit is next"""
+    if n < 0x10:
+        out.append(fixed | n)
+    elif n <= 0xFFFF:
+        out += struct.pack(">BH", code, n)
+    else:
+        out += struct.pack(">BI", code + 1, n)
+
+
+_UINTS = (
+    (0xCC, ">BB", 0xFF),
+    (0xCD, ">BH", 0xFFFF),
+    (0xCE, ">BI", 0xFFFFFFFF),
+    (0xCF, ">BQ", 0xFFFFFFFFFFFFFFFF),
+)
+_INTS = (
+    (0xD0, ">Bb", -0x80),
+    (0xD1, ">Bh", -0x8000),
+    (0xD2, ">Bi", -0x80000000),
+    (0xD3, ">Bq", -0x8000000000000000),
+)
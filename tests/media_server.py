@@ -0,0 +1,92 @@
+"""Local stand-in of the media control server"""
+
+from __future__ import annotations
+
+__all__ = ["MediaServer"]
+
+import hashlib
+import json
+import threading
+import typing as t
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+if t.TYPE_CHECKING:
+    from types import TracebackType
+
+
+class MediaServer:
+    """Serves `data` at `/data`, with an ETag unless `etag` is False
+
+    Records `If-None-Match` headers of `/data` requests and control calls
+    """
+
+    data: dict[str, t.Any]
+    etag: bool
+    if_none_match: list[str | None]
+    controls: list[str]
+
+    def __init__(self, data: dict[str, t.Any], *, etag: bool = True) -> None:
+        self.data = data
+        self.etag = etag
+        self.if_none_match = []
+        self.controls = []
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host!s}:{port}"
+
+    def __enter__(self) -> t.Self:
+        self._thread.start()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handler(self) -> type[BaseHTTPRequestHandler]:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # Keep-alive
+
+            def do_GET(self) -> None:
+                if self.path.startswith("/control/"):
+                    server.controls.append(self.path.removeprefix("/control/"))
+                    self._send(200, b"")
+                elif self.path == "/data":
+                    self._send_data()
+                else:
+                    self._send(200, b"")
+
+            def _send_data(self) -> None:
+                body = json.dumps(server.data).encode()
+                etag = '"%s"' % hashlib.md5(body).hexdigest()  # noqa: S324, UP031
+                if_none_match = self.headers.get("If-None-Match")
+                server.if_none_match.append(if_none_match)
+
+                if server.etag and if_none_match == etag:
+                    self._send(304, b"")
+                else:
+                    self._send(200, body, etag if server.etag else None)
+
+            def _send(self, status: int, body: bytes, etag: str | None = None) -> None:
+                self.send_response(status)
+                if etag:
+                    self.send_header("ETag", etag)
+                if status != 304:
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *_: object) -> None: ...
+
+        return Handler
@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import threading
+import typing as t
+
+import pytest
+
+from pydeck.actions import ActionExecutor, ClickEvent, Debouncer
+
+if t.TYPE_CHECKING:
+    from collections.abc import Iterator
+
+
+@pytest.fixture
+def release() -> Iterator[threading.Event]:
+    release = threading.Event()
+    yield release
+    release.set()
+
+
+def submit(
+    executor: ActionExecutor,
+    name: str,
+    func: t.Callable[[], t.Any],
+) -> ClickEvent:
+    event = ClickEvent({})
+    executor.submit(name, func, {}, event)
+    return event
+
+
+def test_calls_beyond_queue_rejected(release: threading.Event) -> None:
+    executor = ActionExecutor(workers=4, concurrency=1, queue_size=2)
+    events = [submit(executor, "a", release.wait) for _ in range(4)]
+
+    assert [event.status for event in events] == [
+        "dispatched",
+        "queued",
+        "queued",
+        "rejected",
+    ]
+    assert events[3].done.is_set()
+    assert executor.stats["a"].rejected == 1
+
+    release.set()
+    for event in events:
+        assert event.done.wait(5)
+
+    assert [event.status for event in events[:3]] == ["completed"] * 3
+    assert executor.stats["a"].calls == 3
+    executor.shutdown()
+
+
+def test_queued_calls_run_in_order(release: threading.Event) -> None:
+    executor = ActionExecutor(workers=4, concurrency=1, queue_size=4)
+    order: list[int] = []
+
+    def call(i: int) -> t.Callable[[], None]:
+        return lambda: (release.wait(), order.append(i))
+
+    events = [submit(executor, "a", call(i)) for i in range(4)]
+    release.set()
+    for event in events:
+        assert event.done.wait(5)
+
+    assert order == [0, 1, 2, 3]
+    executor.shutdown()
+
+
+def test_per_action_limits(release: threading.Event) -> None:
+    executor = ActionExecutor(workers=8, concurrency=1, queue_size=0, limits={"b": 3})
+
+    a = [submit(executor, "a", release.wait) for _ in range(2)]
+    b = [submit(executor, "b", release.wait) for _ in range(4)]
+
+    assert [event.status for event in a] == ["dispatched", "rejected"]
+    assert [event.status for event in b] == ["dispatched"] * 3 + ["rejected"]
+
+    release.set()
+    for event in a + b:
+        assert event.done.wait(5)
+    executor.shutdown()
+
+
+def test_actions_limited_separately(release: threading.Event) -> None:
+    executor = ActionExecutor(workers=4, concurrency=1, queue_size=0)
+
+    assert submit(executor, "a", release.wait).status == "dispatched"
+    assert submit(executor, "b", release.wait).status == "dispatched"
+    executor.shutdown()
+
+
+def test_failed_action_frees_slot() -> None:
+    executor = ActionExecutor(workers=1, concurrency=1, queue_size=1)
+
+    def fail() -> None:
+        raise RuntimeError
+
+    failed = submit(executor, "a", fail)
+    completed = submit(executor, "a", lambda: None)
+
+    assert failed.done.wait(5)
+    assert completed.done.wait(5)
+    assert failed.status == "failed"
+    assert completed.status == "completed"
+    assert executor.stats["a"].errors == 1
+    assert submit(executor, "a", lambda: None).done.wait(5)
+    executor.shutdown()
+
+
+def test_debouncer_window() -> None:
+    debouncer = Debouncer(window=0.5)
+
+    assert debouncer.accept("a", 10.0)
+    assert not debouncer.accept("a", 10.25)
+    assert debouncer.accept("b", 10.25)
+    # Measured from the last accepted event, not the last dropped one
+    assert debouncer.accept("a", 10.5)
+    assert not debouncer.accept("a", 10.75)
+
+
+def test_debouncer_out_of_order() -> None:
+    debouncer = Debouncer(window=0.5)
+
+    assert debouncer.accept("a", 10.0)
+    assert not debouncer.accept("a", 9.75)
+    assert debouncer.accept("a", 9.5)
+
+
+def test_debouncer_forgets_old_keys() -> None:
+    debouncer = Debouncer(window=0.1)
+
+    for i in range(1025):
+        assert debouncer.accept(i, float(i))
+
+    assert len(debouncer._last) == 1  # noqa: SLF001
+    assert not debouncer.accept(1024, 1024.0)
+
+
+def test_ack() -> None:
+    event = ClickEvent({}, received=1.5)
+    event.event_id = 7
+    event.finish("ignored")
+
+    assert event.done.is_set()
+    assert event.ack() == {
+        "id": 7,
+        "status": "ignored",
+        "received": 1500.0,
+        "dispatched": None,
+        "completed": None,
+    }
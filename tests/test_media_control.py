@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import typing as t
+
+import pytest
+
+from pydeck.plugins.media_control import Main, MediaClient
+
+from .media_server import MediaServer
+
+if t.TYPE_CHECKING:
+    from collections.abc import Iterator
+
+DATA = {
+    "title": "Song",
+    "artist": "Artist",
+    "album_title": "Album",
+    "album_artist": "Artist",
+    "state": "playing",
+}
+
+
+@pytest.fixture
+def client() -> Iterator[MediaClient]:
+    client = MediaClient(timeout=1)
+    yield client
+    client.close()
+
+
+def test_unchanged_poll_sends_etag(client: MediaClient) -> None:
+    with MediaServer(DATA) as server:
+        assert client.get_data(server.url + "/data") == DATA
+        assert client.get_data(server.url + "/data") is None
+
+    assert server.if_none_match[0] is None
+    assert server.if_none_match[1] is not None
+
+
+def test_unchanged_body_without_etag(client: MediaClient) -> None:
+    with MediaServer(DATA, etag=False) as server:
+        assert client.get_data(server.url + "/data") == DATA
+        assert client.get_data(server.url + "/data") is None
+
+        server.data = {**DATA, "state": "paused"}
+        assert client.get_data(server.url + "/data") == server.data
+
+    assert server.if_none_match == [None, None, None]
+
+
+def test_plugin_skips_unchanged_update() -> None:
+    with MediaServer(DATA) as server:
+        plugin = Main()
+        plugin.load()
+        plugin.config["url"] = server.url
+
+        plugin.update()
+        variables = plugin.variables
+        assert variables == DATA
+
+        plugin.update()
+        assert plugin.variables is variables
+
+        plugin._toggle_pause()  # noqa: SLF001
+        assert server.controls == ["pause"]
+
+        plugin.unload()
+
+    assert len(server.if_none_match) == 2
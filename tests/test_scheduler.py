@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+import typing as t
+
+import pytest
+
+from pydeck.aio import EventLoopThread
+from pydeck.scheduler import Scheduler
+
+if t.TYPE_CHECKING:
+    from collections.abc import Iterator
+
+
+@pytest.fixture
+def loop() -> Iterator[EventLoopThread]:
+    loop = EventLoopThread()
+    yield loop
+    loop.stop()
+
+
+@pytest.fixture
+def scheduler(loop: EventLoopThread) -> Iterator[Scheduler]:
+    scheduler = Scheduler(workers=2, timeout=0.05, loop=loop)
+    yield scheduler
+    scheduler.shutdown()
+
+
+def wait(scheduler: Scheduler, name: str) -> None:
+    if future := scheduler.jobs[name].future:
+        future.result(timeout=5)
+
+
+def test_job_due_immediately(scheduler: Scheduler) -> None:
+    calls: list[None] = []
+    scheduler.add("job", lambda: calls.append(None), interval=10)
+
+    next_run = scheduler.tick()
+    wait(scheduler, "job")
+
+    job = scheduler.jobs["job"]
+    assert calls == [None]
+    assert job.next_run == job.started + 10
+    # Wakes up at least every second, to check for timeouts
+    assert next_run == job.started + 1
+
+    scheduler.tick()
+    assert calls == [None]
+
+
+def test_missed_runs_skipped(scheduler: Scheduler) -> None:
+    scheduler.add("job", lambda: None, interval=10)
+    job = scheduler.jobs["job"]
+
+    scheduler.tick()
+    wait(scheduler, "job")
+    first = job.started
+    assert job.next_run == first + 10
+
+    # Several intervals late: one run, next one interval from now
+    job.next_run -= 35
+    scheduler.tick()
+    wait(scheduler, "job")
+
+    assert job.runs == 2
+    assert job.next_run == job.started + 10
+
+
+def test_running_job_not_resubmitted(scheduler: Scheduler) -> None:
+    release = threading.Event()
+    scheduler.add("job", release.wait, interval=0)
+    job = scheduler.jobs["job"]
+
+    scheduler.tick()
+    future = job.future
+    time.sleep(0.01)
+    scheduler.tick()
+
+    assert job.future is future
+    release.set()
+    wait(scheduler, "job")
+    assert job.runs == 1
+
+
+def test_sync_overrun_counted_once(scheduler: Scheduler) -> None:
+    release = threading.Event()
+    scheduler.add("job", release.wait, interval=0)
+    job = scheduler.jobs["job"]
+
+    scheduler.tick()
+    time.sleep(0.1)
+    scheduler.tick()
+    scheduler.tick()
+
+    assert job.timed_out
+    assert job.overruns == 1
+
+    release.set()
+    wait(scheduler, "job")
+    scheduler.tick()
+
+    assert not job.timed_out
+    assert job.runs == 1
+
+
+def test_async_overrun_cancelled(scheduler: Scheduler) -> None:
+    cancelled = threading.Event()
+
+    async def job() -> None:
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    scheduler.add("job", job, interval=10)
+    scheduler.tick()
+    wait(scheduler, "job")
+
+    assert cancelled.is_set()
+    assert scheduler.jobs["job"].overruns == 1
+    assert scheduler.jobs["job"].errors == 0
+
+
+def test_errors_counted(scheduler: Scheduler) -> None:
+    def job() -> None:
+        raise RuntimeError
+
+    scheduler.add("job", job, interval=10)
+    scheduler.tick()
+    wait(scheduler, "job")
+
+    assert scheduler.jobs["job"].errors == 1
+    assert scheduler.jobs["job"].runs == 1
+
+
+def test_async_job_needs_loop() -> None:
+    async def job() -> None:
+        pass
+
+    scheduler = Scheduler(workers=1, timeout=1)
+
+    with pytest.raises(ValueError, match="no event loop"):
+        scheduler.add("job", job, interval=1)
+
+    scheduler.shutdown()
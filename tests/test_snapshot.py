@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from pydeck.button import Button
+from pydeck.snapshot import SnapshotLog
+from pydeck.wire import pack_id
+
+
+@pytest.fixture
+def log() -> SnapshotLog:
+    log = SnapshotLog(version=100, maxlen=3)
+    log.publish({(0, 0): Button("a"), (0, 1): Button("b")})  # 101
+    log.publish({(0, 0): Button("c")})  # 102
+    log.publish({}, removed=[(0, 1)])  # 103
+    return log
+
+
+def buttons(delta: dict) -> dict[tuple[int, int], str]:
+    return {tuple(button["id"]): button["text"] for button in delta["buttons"]}
+
+
+def test_versions_and_etag(log: SnapshotLog) -> None:
+    assert log.current.version == 103
+    assert log.current.etag == "67"
+    assert dict(log.buttons) == {(0, 0): Button("c")}
+
+
+def test_full(log: SnapshotLog) -> None:
+    snapshot, body = log.full()
+
+    assert snapshot is log.current
+    assert json.loads(body) == [{"id": [0, 0], **Button("c").as_dict()}]
+
+
+def test_delta_since_logged_version(log: SnapshotLog) -> None:
+    delta = json.loads(log.delta(101))
+
+    assert delta["version"] == 103
+    assert not delta["full"]
+    assert buttons(delta) == {(0, 0): "c"}
+    assert delta["removed"] == [[0, 1]]
+
+
+def test_delta_since_oldest_base(log: SnapshotLog) -> None:
+    delta = json.loads(log.delta(100))
+
+    assert not delta["full"]
+    assert buttons(delta) == {(0, 0): "c"}
+    assert delta["removed"] == [[0, 1]]
+
+
+def test_delta_since_current_is_empty(log: SnapshotLog) -> None:
+    delta = json.loads(log.delta(103))
+
+    assert not delta["full"]
+    assert delta["buttons"] == []
+    assert delta["removed"] == []
+
+
+@pytest.mark.parametrize("since", [0, 99, 104, -1])
+def test_delta_since_unknown_version_is_full(log: SnapshotLog, since: int) -> None:
+    delta = json.loads(log.delta(since))
+
+    assert delta["version"] == 103
+    assert delta["full"]
+    assert buttons(delta) == {(0, 0): "c"}
+    assert "removed" not in delta
+
+
+def test_delta_since_version_dropped_from_log(log: SnapshotLog) -> None:
+    log.publish({(1, 0): Button("d")})  # 104, drops 101 from the log
+
+    assert json.loads(log.delta(100))["full"]
+    assert not json.loads(log.delta(101))["full"]
+
+
+def test_delta_cached_until_publish(log: SnapshotLog) -> None:
+    body = log.delta(101)
+    assert log.delta(101) is body
+
+    log.publish({(1, 0): Button("d")})
+
+    assert log.delta(101) is not body
+    assert buttons(json.loads(log.delta(103))) == {(1, 0): "d"}
+
+
+def test_empty_log() -> None:
+    log = SnapshotLog(version=5, maxlen=3)
+
+    assert json.loads(log.delta(5)) == {
+        "version": 5,
+        "full": False,
+        "buttons": [],
+        "removed": [],
+    }
+    assert json.loads(log.delta(4))["full"]
+
+
+def test_binary_delta(log: SnapshotLog) -> None:
+    msgpack = pytest.importorskip("msgpack")
+
+    version, full, styles, flat, removed = msgpack.unpackb(log.delta(101, binary=True))
+
+    assert (version, full) == (103, False)
+    assert flat == [pack_id((0, 0)), "c", 0, None]
+    assert len(styles) == 1
+    assert removed == [pack_id((0, 1))]
+
+    assert msgpack.unpackb(log.delta(99, binary=True))[1]
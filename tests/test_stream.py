@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import queue
+
+import pytest
+
+from pydeck.stream import CLOSED, RESYNC, Broadcaster, Subscription, sse_message
+
+
+def test_sse_message() -> None:
+    assert sse_message(b"{}") == b"data: {}\n\n"
+    assert sse_message(b"{}", event="ack") == b"event: ack\ndata: {}\n\n"
+
+
+def test_messages_in_order() -> None:
+    subscription = Subscription(maxsize=4)
+
+    assert subscription.put(1)
+    assert subscription.put(2)
+    assert len(subscription) == 2
+
+    assert subscription.get(timeout=0) == 1
+    assert subscription.get(timeout=0) == 2
+
+
+def test_get_timeout() -> None:
+    subscription = Subscription(maxsize=4)
+
+    with pytest.raises(queue.Empty):
+        subscription.get(timeout=0.01)
+
+
+def test_overflow_replaces_pending_with_resync() -> None:
+    subscription = Subscription(maxsize=2)
+
+    assert subscription.put(1)
+    assert subscription.put(2)
+    assert not subscription.put(3)
+
+    assert len(subscription) == 1
+    assert subscription.get(timeout=0) is RESYNC
+
+    assert subscription.put(4)
+    assert subscription.get(timeout=0) == 4
+
+
+def test_publish_counts_overflowed_subscribers() -> None:
+    broadcaster = Broadcaster(maxsize=1)
+    slow = broadcaster.subscribe()
+    fast = broadcaster.subscribe()
+
+    assert broadcaster.publish(b"a") == 0
+    assert fast.get(timeout=0) == b"a"
+
+    assert broadcaster.publish(b"b") == 1
+    assert slow.get(timeout=0) is RESYNC
+    assert fast.get(timeout=0) == b"b"
+
+
+def test_unsubscribed_gets_nothing() -> None:
+    broadcaster = Broadcaster()
+    subscription = broadcaster.subscribe()
+    broadcaster.unsubscribe(subscription)
+
+    broadcaster.publish(b"a")
+
+    assert len(broadcaster) == 0
+    assert len(subscription) == 0
+
+
+def test_close_ends_subscriptions() -> None:
+    broadcaster = Broadcaster()
+    subscription = broadcaster.subscribe()
+    broadcaster.publish(b"a")
+
+    broadcaster.close()
+    broadcaster.publish(b"b")
+
+    assert len(broadcaster) == 0
+    assert subscription.get(timeout=0) is CLOSED
+    assert len(subscription) == 0
+
+    late = broadcaster.subscribe()
+    assert late.closed
+    assert late.get(timeout=0) is CLOSED
@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import pytest
+
+from pydeck.template import Template
+
+
+def test_constant() -> None:
+    template = Template("Play {{now}}")
+
+    assert template.variables == frozenset()
+    assert template.render({}) == "Play {now}"
+
+
+def test_variables_by_root_name() -> None:
+    template = Template("{a__title} {b__list[0]} {c__obj.name!r:>{a__width}}")
+
+    assert template.variables == {"a__title", "b__list", "c__obj", "a__width"}
+
+
+def test_render() -> None:
+    template = Template("{title!r:>{width}} [{items[1]}]")
+    variables = {"title": "x", "width": 5, "items": [1, 2]}
+
+    assert template.render(variables) == "  'x' [2]"
+
+
+def test_missing_variable_raises() -> None:
+    with pytest.raises(KeyError):
+        Template("{title} {artist}").render({"title": "Song"})
+
+
+def test_missing_variable_text() -> None:
+    template = Template("{title} - {artist:>{width}}")
+
+    assert template.render({"title": "Song"}, missing="?") == "Song - ?"
+    assert template.render({"artist": "A"}, missing="?") == "? - ?"
+    assert template.render({"artist": "A", "width": 2}, missing="?") == "? -  A"
+
+
+@pytest.mark.parametrize("source", ["{}", "{0}", "a {} b", "{title:{}}"])
+def test_positional_field_rejected(source: str) -> None:
+    with pytest.raises(ValueError, match="Positional field"):
+        Template(source)
+
+
+def test_variable_sets_shared() -> None:
+    assert Template("{a} {b}").variables is Template("{b}{a}").variables
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import typing as t
+
+from pydeck.variables import VariableStore
+
+if t.TYPE_CHECKING:
+    from pydeck.variables import VariableKey
+
+
+def test_collect_changes_since_previous_call() -> None:
+    store = VariableStore()
+    store.update("p", {"a": 1, "b": 2})
+    store.set("q", "c", 3)
+
+    assert store.collect_changes() == {("p", "a"), ("p", "b"), ("q", "c")}
+    assert store.collect_changes() == set()
+
+    store.set("p", "a", 10)
+
+    assert store.collect_changes() == {("p", "a")}
+
+
+def test_unchanged_values_not_collected() -> None:
+    store = VariableStore()
+    store.update("p", {"a": 1, "b": 2})
+    store.collect_changes()
+    version = store.version
+
+    assert store.update("p", {"a": 1, "b": 2}) == set()
+    assert not store.set("p", "a", 1)
+
+    assert store.collect_changes() == set()
+    assert store.version == version
+
+
+def test_changes_accumulate_between_calls() -> None:
+    store = VariableStore()
+    store.set("p", "a", 1)
+    store.set("p", "a", 2)
+    store.set("p", "b", 1)
+
+    assert store.collect_changes() == {("p", "a"), ("p", "b")}
+    assert store.get("p", "a") == 2
+
+
+def test_replace_and_remove_collect_deleted() -> None:
+    store = VariableStore()
+    store.update("p", {"a": 1, "b": 2})
+    store.set("q", "c", 3)
+    store.collect_changes()
+
+    assert store.update("p", {"a": 1}, replace=True) == {("p", "b")}
+    assert store.collect_changes() == {("p", "b")}
+    assert "p__b" not in store.flat
+
+    assert store.remove_plugin("p") == {("p", "a")}
+    assert store.collect_changes() == {("p", "a")}
+    assert dict(store.flat) == {"q__c": 3}
+
+
+def test_key_versions() -> None:
+    store = VariableStore()
+
+    assert store.key_version("p", "a") == 0
+
+    store.update("p", {"a": 1, "b": 2})
+    store.set("p", "b", 3)
+
+    assert store.version == 2
+    assert store.key_version("p", "a") == 1
+    assert store.key_version("p", "b") == 2
+
+
+def test_subscribers() -> None:
+    store = VariableStore()
+    calls: list[tuple[VariableKey, t.Any]] = []
+
+    def callback(key: VariableKey, value: t.Any) -> None:  # noqa: ANN401
+        calls.append((key, value))
+
+    store.subscribe(("p", "a"), callback)
+    store.update("p", {"a": 1, "b": 2})
+    store.set("p", "a", 1)
+    store.unsubscribe(("p", "a"), callback)
+    store.set("p", "a", 2)
+
+    assert calls == [(("p", "a"), 1)]
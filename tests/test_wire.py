@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import pytest
+
+from pydeck import wire
+from pydeck.button import Button
+from pydeck.wire import encode_frame, pack_id, packb
+
+VALUES = [
+    None,
+    True,
+    False,
+    0,
+    127,
+    128,
+    255,
+    256,
+    65536,
+    2**32,
+    2**64 - 1,
+    -1,
+    -32,
+    -33,
+    -129,
+    -32769,
+    -(2**31) - 1,
+    -(2**63),
+    1.5,
+    "",
+    "ä" * 31,
+    "a" * 32,
+    "a" * 256,
+    "a" * 65536,
+    b"\x00",
+    b"a" * 256,
+    b"a" * 65536,
+    list(range(15)),
+    list(range(16)),
+    list(range(65536)),
+    {"a": [1, {"b": None}]},
+    {str(i): i for i in range(16)},
+]
+
+
+@pytest.fixture
+def pure(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(wire, "msgpack", None)
+
+
+def test_pack_id() -> None:
+    assert pack_id((0, 0)) == 0
+    assert pack_id((0, 1)) == 1
+    assert pack_id((1, 0)) == 0x10000
+    assert pack_id((3, 65535)) == 0x3FFFF
+
+
+@pytest.mark.usefixtures("pure")
+@pytest.mark.parametrize(
+    ("value", "packed"),
+    [
+        (None, b"\xc0"),
+        (True, b"\xc3"),
+        (1, b"\x01"),
+        (-1, b"\xff"),
+        (200, b"\xcc\xc8"),
+        (-200, b"\xd1\xff\x38"),
+        ("ab", b"\xa2ab"),
+        ([1, "a"], b"\x92\x01\xa1a"),
+        ({"a": None}, b"\x81\xa1a\xc0"),
+        (b"ab", b"\xc4\x02ab"),
+    ],
+)
+def test_pure_packb(value: object, packed: bytes) -> None:
+    assert packb(value) == packed
+
+
+@pytest.mark.usefixtures("pure")
+def test_pure_packb_limits() -> None:
+    with pytest.raises(OverflowError):
+        packb(2**64)
+    with pytest.raises(OverflowError):
+        packb(-(2**63) - 1)
+    with pytest.raises(TypeError):
+        packb(object())
+
+
+@pytest.mark.parametrize("value", VALUES, ids=range(len(VALUES)))
+def test_pure_packb_matches_msgpack(
+    monkeypatch: pytest.MonkeyPatch,
+    value: object,
+) -> None:
+    msgpack = pytest.importorskip("msgpack")
+    expected = msgpack.packb(value)
+
+    monkeypatch.setattr(wire, "msgpack", None)
+
+    assert packb(value) == expected
+    assert msgpack.unpackb(packb(value), strict_map_key=False) == value
+
+
+def test_encode_frame() -> None:
+    msgpack = pytest.importorskip("msgpack")
+    a = Button("a", font_size="1em")
+    b = Button("b", icon="/icons/x.png")
+    c = Button("c", font_size="1em")
+
+    frame = encode_frame(
+        7,
+        full=False,
+        buttons=[((0, 0), a), ((0, 1), b), ((1, 0), c)],
+        removed=[(2, 3)],
+    )
+    version, full, styles, flat, removed = msgpack.unpackb(frame)
+
+    assert (version, full) == (7, False)
+    assert styles == [
+        [a.text_align, a.font_family, "1em"],
+        [b.text_align, b.font_family, b.font_size],
+    ]
+    assert flat == [0, "a", 0, None, 1, "b", 1, "/icons/x.png", 0x10000, "c", 0, None]
+    assert removed == [0x20003]
+
+
+@pytest.mark.usefixtures("pure")
+def test_encode_empty_frame() -> None:
+    assert encode_frame(1, full=True, buttons=[]) == b"\x95\x01\xc3\x90\x90\x90"